@@ -3,12 +3,10 @@
 
 import argparse
 import asyncio
-import glob
 import json
 import os.path
 import platform
-import random
-import string
+import time
 
 import aiohttp
 
@@ -21,19 +19,33 @@ async def main(args):
     # Load config
     config = load_config(args.config_file)
 
+    # Back off and retry when rate limited, waiting as long as the server asks for
+    dfxapi.Settings.retry_policy = dfxapi.RetryPolicy()
+
+    # Record how long each phase of the REST requests took
+    request_tracer = dfxapi.RequestTracer() if args.timings else None
+
+    # Use one client, and thus one pool of warm connections, for every request the command makes
+    async with dfxapi.DfxClient(request_tracer=request_tracer) as client:
+        await run_command(client, args, config)
+
+    if request_tracer is not None:
+        print(json.dumps(request_tracer.summary())) if args.json else print_pretty(request_tracer.summary(), args.csv)
+
+
+async def run_command(client: dfxapi.DfxClient, args, config):
     # Check API status
-    async with aiohttp.ClientSession(raise_for_status=True) as session:
-        _, api_status = await dfxapi.General.api_status(session)
-        if not api_status["StatusID"] == "ACTIVE":
-            print(f"DeepAffex Cloud API: {dfxapi.Settings.rest_url} Status: {api_status['StatusID']}")
-            return
+    _, api_status = await client.general.api_status(raise_for_status=True)
+    if not api_status["StatusID"] == "ACTIVE":
+        print(f"DeepAffex Cloud API: {dfxapi.Settings.rest_url} Status: {api_status['StatusID']}")
+        return
 
     # Register or unregister
     if args.command == "org":
         if args.subcommand == "unregister":
-            success = await unregister(config)
+            success = await unregister(client, config)
         else:
-            success = await register(config, args.license_key)
+            success = await register(client, config, args.license_key)
 
         if success:
             save_config(config, args.config_file)
@@ -42,12 +54,12 @@ async def main(args):
     # Login or logout
     if args.command == "user":
         if args.subcommand == "logout":
-            success = await logout(config)
+            success = await logout(client, config)
             if success:
                 save_config(config, args.config_file)
             return
         elif args.subcommand == "login":
-            success = await login(config, args.email, args.password)
+            success = await login(client, config, args.email, args.password)
             if success:
                 save_config(config, args.config_file)
             return
@@ -57,79 +69,84 @@ async def main(args):
         print("Please register and/or login first to obtain a token")
         return
 
-    # Verify and if necessary, attempt to renew the token
-    verified, renewed, headers, new_config = await verify_renew_token(config)
-    if not verified:
-        save_config(new_config, args.config_file)
-        if not renewed:
-            return
+    # Renew the token in the background before it expires, and on an unexpected 401
+    if not await start_token_renewal(client, config, args.config_file):
+        return
 
     # Create, update, remove profiles
     if args.command == "profile":
-        async with aiohttp.ClientSession(headers=headers, raise_for_status=False) as session:
-            if args.subcommand == "create":
-                _, profile_id = await dfxapi.Profiles.create(session, args.name, args.email)
-                print(json.dumps(profile_id)) if args.json else print_pretty(profile_id, args.csv)
-            elif args.subcommand == "update":
-                _, body = await dfxapi.Profiles.update(session, args.profile_id, args.name, args.email, args.status)
-                print(json.dumps(body)) if args.json else print_pretty(body, args.csv)
-            elif args.subcommand == "remove":
-                _, body = await dfxapi.Profiles.delete(session, args.profile_id)
-                print(json.dumps(body)) if args.json else print_pretty(body, args.csv)
-            elif args.subcommand == "get":
-                _, profile = await dfxapi.Profiles.retrieve(session, args.profile_id)
-                print(json.dumps(profile)) if args.json else print_pretty(profile, args.csv)
-            elif args.subcommand == "list":
-                _, profile_list = await dfxapi.Profiles.list(session)
-                print(json.dumps(profile_list)) if args.json else print_pretty(profile_list, args.csv)
+        if args.subcommand == "create":
+            _, profile_id = await client.profiles.create(args.name, args.email)
+            print(json.dumps(profile_id)) if args.json else print_pretty(profile_id, args.csv)
+        elif args.subcommand == "update":
+            _, body = await client.profiles.update(args.profile_id, args.name, args.email, args.status)
+            print(json.dumps(body)) if args.json else print_pretty(body, args.csv)
+        elif args.subcommand == "remove":
+            _, body = await client.profiles.delete(args.profile_id)
+            print(json.dumps(body)) if args.json else print_pretty(body, args.csv)
+        elif args.subcommand == "get":
+            _, profile = await client.profiles.retrieve(args.profile_id)
+            print(json.dumps(profile)) if args.json else print_pretty(profile, args.csv)
+        elif args.subcommand == "list":
+            _, profile_list = await client.profiles.list()
+            print(json.dumps(profile_list)) if args.json else print_pretty(profile_list, args.csv)
         return
 
     # Retrieve or list studies
     if args.command == "study":
-        async with aiohttp.ClientSession(headers=headers, raise_for_status=False) as session:
-            if args.subcommand == "get":
-                study_id = config["selected_study"] if args.study_id is None else args.study_id
-                if not study_id or study_id.isspace():
-                    print("Please select a study or pass a study id")
-                    return
-                _, study = await dfxapi.Studies.retrieve(session, study_id)
-                print(json.dumps(study)) if args.json else print_pretty(study, args.csv)
-            elif args.subcommand == "get_sdk_cfg_data":
-                _, study_cfg = await dfxapi.Studies.retrieve_sdk_config_data(session, args.study_id, args.sdk_id,
-                                                                             args.current_hash)
-                print(json.dumps(study_cfg)) if args.json else print_pretty(study_cfg, args.csv)
-            elif args.subcommand == "list":
-                _, studies = await dfxapi.Studies.list(session)
-                print(json.dumps(studies)) if args.json else print_pretty(studies, args.csv)
-            elif args.subcommand == "select":
-                status, response = await dfxapi.Studies.retrieve(session, args.study_id, raise_for_status=False)
-                if status >= 400:
-                    print_pretty(response)
-                    return
-                config["selected_study"] = args.study_id
-                save_config(config, args.config_file)
+        if args.subcommand == "get":
+            study_id = config["selected_study"] if args.study_id is None else args.study_id
+            if not study_id or study_id.isspace():
+                print("Please select a study or pass a study id")
+                return
+            _, study = await client.studies.retrieve(study_id)
+            print(json.dumps(study)) if args.json else print_pretty(study, args.csv)
+        elif args.subcommand == "get_sdk_cfg_data":
+            study_id = config["selected_study"] if args.study_id is None else args.study_id
+            if not study_id or study_id.isspace():
+                print("Please select a study or pass a study id")
+                return
+            # Only downloads the config when the cached copy is missing or out of date
+            store = dfxapi.SdkConfigStore(args.store_folder)
+            md5_hash, study_cfg = await store.retrieve(client.session, study_id, args.sdk_id)
+            with study_cfg:
+                result = {"MD5Hash": md5_hash, "Path": store.blob_path(md5_hash), "Size": len(study_cfg)}
+            print(json.dumps(result)) if args.json else print_pretty(result, args.csv)
+        elif args.subcommand == "list":
+            _, studies = await client.studies.list()
+            print(json.dumps(studies)) if args.json else print_pretty(studies, args.csv)
+        elif args.subcommand == "select":
+            status, response = await client.studies.retrieve(args.study_id, raise_for_status=False)
+            if status >= 400:
+                print_pretty(response)
+                return
+            config["selected_study"] = args.study_id
+            save_config(config, args.config_file)
         return
 
     # Retrieve or list measurements
-    if args.command == "measure" and args.subcommand != "make":
-        async with aiohttp.ClientSession(headers=headers, raise_for_status=False) as session:
-            if args.subcommand == "get":
-                measurement_id = config["last_measurement"] if args.measurement_id is None else args.measurement_id
-                if not measurement_id or measurement_id.isspace():
-                    print("Please complete a measurement first or pass a measurement id")
-                    return
-                _, results = await dfxapi.Measurements.retrieve(session, measurement_id)
-                print(json.dumps(results)) if args.json else print_meas(results, args.csv)
-            elif args.subcommand == "list":
-                _, measurements = await dfxapi.Measurements.list(session,
-                                                                 limit=args.limit,
-                                                                 user_profile_id=args.profile_id,
-                                                                 partner_id=args.partner_id)
-                print(json.dumps(measurements)) if args.json else print_pretty(measurements, args.csv)
+    if args.command == "measure" and args.subcommand not in ("make", "batch", "export"):
+        if args.subcommand == "get":
+            measurement_id = config["last_measurement"] if args.measurement_id is None else args.measurement_id
+            if not measurement_id or measurement_id.isspace():
+                print("Please complete a measurement first or pass a measurement id")
+                return
+            _, results = await client.measurements.retrieve(measurement_id)
+            print(json.dumps(results)) if args.json else print_meas(results, args.csv)
+        elif args.subcommand == "list":
+            _, measurements = await client.measurements.list(limit=args.limit,
+                                                             user_profile_id=args.profile_id,
+                                                             partner_id=args.partner_id)
+            print(json.dumps(measurements)) if args.json else print_pretty(measurements, args.csv)
+        return
+
+    # Export measurement results, one column per signal
+    if args.command == "measure" and args.subcommand == "export":
+        await measure_export(client, args)
         return
 
     # Make a measurement
-    assert args.command == "measure" and args.subcommand == "make"
+    assert args.command == "measure" and args.subcommand in ("make", "batch")
 
     # Verify preconditions
     # 1. Make sure a study is selected
@@ -137,59 +154,41 @@ async def main(args):
         print("Please select a study first using 'study select'")
         return
 
-    # 2. Make sure payload files exist
-    payload_files = sorted(glob.glob(os.path.join(args.payloads_folder, "payload*.bin")))
-    prop_files = sorted(glob.glob(os.path.join(args.payloads_folder, "properties*.json")))
-    found_props = True if len(prop_files) > 0 else False
-    if not found_props:
-        prop_files = payload_files
+    # Make many measurements concurrently
+    if args.subcommand == "batch":
+        await measure_batch(client, args, config)
+        return
 
-    number_files = min(len(payload_files), len(prop_files))
-    if number_files <= 0:
-        print(f"No payload files found in {args.payloads_folder}")
+    # 2. Make sure payload files exist and are consistent
+    payloads = dfxapi.PayloadFolder(args.payloads_folder, args.chunk_duration_s)
+    try:
+        payloads.validate()
+    except ValueError as e:
+        print(e)
         return
-    if found_props:
-        with open(prop_files[0], 'r') as pr:
-            props = json.load(pr)
-            number_chunks_pr = props["number_chunks"]
-            if "duration_s" in props:
-                duration_pr = props["duration_s"]
-            else:
-                duration_pr = props["end_time_s"] - props["start_time_s"]
-                props["duration_s"] = duration_pr
-        if number_chunks_pr != number_files:
-            print(f"Number of chunks in properties.json {number_chunks_pr} != Number of payload files {number_files}")
-            return
-        if duration_pr * number_chunks_pr > 120:
-            print(f"Total payload duration {duration_pr * number_chunks_pr} seconds is more than 120 seconds")
-            return
-    else:
-        duration_pr = args.chunk_duration_s
-        number_chunks_pr = number_files
 
     use_websocket = not args.rest
-    async with aiohttp.ClientSession(headers=headers, raise_for_status=True) as session:
-        # Create a measurement
-        _, create_result = await dfxapi.Measurements.create(session,
-                                                            config["selected_study"],
-                                                            user_profile_id=args.user_profile_id,
-                                                            partner_id=args.partner_id)
-        measurement_id = create_result["ID"]
-        print(f"Created measurement {measurement_id}")
-
-        measurement_files = zip(payload_files, prop_files)
-        # Add data to the measurement
-        if use_websocket:
-            # Make a measurement using WebSocket
-            await measure_websocket(session, measurement_id, measurement_files, number_chunks_pr, duration_pr, found_props)
-        else:
-            # Make a measurement using REST (no results are returned)
-            await measure_rest(session, measurement_id, measurement_files, number_chunks_pr, duration_pr, found_props)
 
-        print(f"Measurement {measurement_id} complete")
+    # Create a measurement
+    _, create_result = await client.measurements.create(config["selected_study"],
+                                                        user_profile_id=args.user_profile_id,
+                                                        partner_id=args.partner_id,
+                                                        raise_for_status=True)
+    measurement_id = create_result["ID"]
+    print(f"Created measurement {measurement_id}")
+
+    # Add data to the measurement
+    if use_websocket:
+        # Make a measurement using WebSocket
+        await measure_websocket(client, measurement_id, payloads)
+    else:
+        # Make a measurement using REST (no results are returned)
+        await measure_rest(client, measurement_id, payloads, args.rest_body_type)
 
-        config["last_measurement"] = measurement_id
-        save_config(config, args.config_file)
+    print(f"Measurement {measurement_id} complete")
+
+    config["last_measurement"] = measurement_id
+    save_config(config, args.config_file)
 
 
 def load_config(config_file):
@@ -203,8 +202,6 @@ def load_config(config_file):
         "user_refresh_token": "",
         "selected_study": "",
         "last_measurement": "",
-        "study_cfg_hash": "",
-        "study_cfg_data": "",
     }
     if os.path.isfile(config_file):
         with open(config_file, "r") as c:
@@ -232,69 +229,59 @@ def save_config(config, config_file):
         print(f"Credentials updated in {config_file}")
 
 
-def generate_reqid():
-    return "".join(random.choices(string.ascii_letters, k=10))
-
-
-def determine_action(chunk_number, number_chunks):
-    action = 'CHUNK::PROCESS'
-    if chunk_number == 0 and number_chunks > 1:
-        action = 'FIRST::PROCESS'
-    elif chunk_number == number_chunks - 1:
-        action = 'LAST::PROCESS'
-    return action
-
-
-async def register(config, license_key):
+async def register(client, config, license_key):
     if dfxapi.Settings.device_token:
         print("Already registered")
         return False
 
     try:
-        async with aiohttp.ClientSession(raise_for_status=True) as session:
-            await dfxapi.Organizations.register_license(session, license_key, "LINUX", "DFX Example", "DFXCLIENT",
-                                                        "0.0.1")
-            config["device_id"] = dfxapi.Settings.device_id
-            config["device_token"] = dfxapi.Settings.device_token
-            config["device_refresh_token"] = dfxapi.Settings.device_refresh_token
-            config["role_id"] = dfxapi.Settings.role_id
-
-            # The following need to be cleared since we make measurements and user/device tokens are linked
-            config["user_token"] = dfxapi.Settings.user_token = ""
-            config["user_refresh_token"] = dfxapi.Settings.user_refresh_token = ""
-
-            print(f"Register successful with new device id {config['device_id']}")
+        client.set_token(None)
+        await client.organizations.register_license(license_key,
+                                                    "LINUX",
+                                                    "DFX Example",
+                                                    "DFXCLIENT",
+                                                    "0.0.1",
+                                                    raise_for_status=True)
+        config["device_id"] = dfxapi.Settings.device_id
+        config["device_token"] = dfxapi.Settings.device_token
+        config["device_refresh_token"] = dfxapi.Settings.device_refresh_token
+        config["role_id"] = dfxapi.Settings.role_id
+
+        # The following need to be cleared since we make measurements and user/device tokens are linked
+        config["user_token"] = dfxapi.Settings.user_token = ""
+        config["user_refresh_token"] = dfxapi.Settings.user_refresh_token = ""
+
+        print(f"Register successful with new device id {config['device_id']}")
         return True
     except aiohttp.ClientResponseError as e:
         print(f"Register failed: {e}")
         return False
 
 
-async def unregister(config):
+async def unregister(client, config):
     if not dfxapi.Settings.device_token:
         print("Not registered")
         return False
 
-    headers = {"Authorization": f"Bearer {dfxapi.Settings.device_token}"}
-    async with aiohttp.ClientSession(headers=headers) as session:
-        status, body = await dfxapi.Organizations.unregister_license(session)
-        if status < 400:
-            print(f"Unregister successful for device id {config['device_id']}")
-            config["device_id"] = ""
-            config["device_token"] = ""
-            config["device_refresh_token"] = ""
-            config["role_id"] = ""
+    client.set_token(dfxapi.Settings.device_token)
+    status, body = await client.organizations.unregister_license()
+    if status < 400:
+        print(f"Unregister successful for device id {config['device_id']}")
+        config["device_id"] = ""
+        config["device_token"] = ""
+        config["device_refresh_token"] = ""
+        config["role_id"] = ""
 
-            # The following need to be cleared since we make measurements and user/device tokens are linked
-            config["user_token"] = dfxapi.Settings.user_token = ""
-            config["user_refresh_token"] = dfxapi.Settings.user_refresh_token = ""
+        # The following need to be cleared since we make measurements and user/device tokens are linked
+        config["user_token"] = dfxapi.Settings.user_token = ""
+        config["user_refresh_token"] = dfxapi.Settings.user_refresh_token = ""
 
-            return True
-        else:
-            print(f"Unregister failed {status}: {body}")
+        return True
+    else:
+        print(f"Unregister failed {status}: {body}")
 
 
-async def login(config, email, password):
+async def login(client, config, email, password):
     if dfxapi.Settings.user_token:
         print("Already logged in")
         return False
@@ -303,209 +290,212 @@ async def login(config, email, password):
         print("Please register first to obtain a device_token")
         return False
 
-    headers = {"Authorization": f"Bearer {dfxapi.Settings.device_token}"}
-    async with aiohttp.ClientSession(headers=headers) as session:
-        status, body = await dfxapi.Users.login(session, email, password)
-        if status < 400:
-            config["user_token"] = dfxapi.Settings.user_token
-            config["user_refresh_token"] = dfxapi.Settings.user_refresh_token
+    client.set_token(dfxapi.Settings.device_token)
+    status, body = await client.users.login(email, password)
+    if status < 400:
+        config["user_token"] = dfxapi.Settings.user_token
+        config["user_refresh_token"] = dfxapi.Settings.user_refresh_token
 
-            print("Login successful")
-            return True
-        else:
-            print(f"Login failed {status}: {body}")
-            return False
+        print("Login successful")
+        return True
+    else:
+        print(f"Login failed {status}: {body}")
+        return False
 
 
-async def logout(config):
+async def logout(client, config):
     if not dfxapi.Settings.user_token:
         print("Not logged in")
         return False
 
-    headers = {"Authorization": f"Bearer {dfxapi.Settings.user_token}"}
-    async with aiohttp.ClientSession(headers=headers, raise_for_status=True) as session:
-        await dfxapi.Users.logout(session)
-        config["user_token"] = dfxapi.Settings.user_token
-        config["user_refresh_token"] = dfxapi.Settings.user_refresh_token
-        config["user_id"] = ""
+    client.set_token(dfxapi.Settings.user_token)
+    await client.users.logout(raise_for_status=True)
+    config["user_token"] = dfxapi.Settings.user_token
+    config["user_refresh_token"] = dfxapi.Settings.user_refresh_token
+    config["user_id"] = ""
 
-        print("Logout successful")
+    print("Logout successful")
     return True
 
 
-async def verify_renew_token(config):
-    # Use the token to create the headers
-    if dfxapi.Settings.user_token:
-        headers = {"Authorization": f"Bearer {dfxapi.Settings.user_token}"}
-        using_user_token = True
-    else:
-        headers = {"Authorization": f"Bearer {dfxapi.Settings.device_token}"}
-        using_user_token = False
-
-    # Verify that our token is still valid and renew if it's not
-    async with aiohttp.ClientSession(headers=headers, raise_for_status=False) as session:
-        status, body = await dfxapi.General.verify_token(session)
-        if status < 400:
-            return True, False, headers, None
-
-        # It's not valid, so attempt to renew it...
-        if using_user_token:
-            renew_status, renew_body = await dfxapi.Auths.renew_user_token(session)
-        else:
-            renew_status, renew_body = await dfxapi.Auths.renew_device_token(session)
-
-        # Renew failed
-        if renew_status >= 400:
-            # Show error from verify_token failure
-            print(f"Your {'user' if using_user_token else 'device'} token could not be verified.")
-            print_pretty(body)
-
-            # Show error from renew_token failure
-            print("Attempted token refresh but failed, please register and/or login again!")
-            print_pretty(renew_body)
-
-            # Erase saved tokens
-            if using_user_token:
-                config["user_token"] = ""
-                config["user_refresh_token"] = ""
-            else:
-                config["device_id"] = ""
-                config["device_token"] = ""
-                config["device_refresh_token"] = ""
-                config["role_id"] = ""
-                config["user_id"] = ""
-
-            # Exit since we cannot continue
-            return False, False, None, config
+async def start_token_renewal(client, config, config_file):
+    using_user_token = bool(dfxapi.Settings.user_token)
 
+    def on_renewed(token_manager):
         # Renew worked, so save new tokens
-        if using_user_token:
+        if token_manager.using_user_token:
             config["user_token"] = dfxapi.Settings.user_token
             config["user_refresh_token"] = dfxapi.Settings.user_refresh_token
-
-            # Adjust headers
-            headers = {"Authorization": f"Bearer {dfxapi.Settings.user_token}"}
         else:
             config["device_token"] = dfxapi.Settings.device_token
             config["device_refresh_token"] = dfxapi.Settings.device_refresh_token
-
-            # Adjust headers
-            headers = {"Authorization": f"Bearer {dfxapi.Settings.device_token}"}
-
-        # Continue
+        save_config(config, config_file)
         print("Refreshed token. Continuing with command...")
 
-        return False, True, headers, config
+    try:
+        # An expired token is renewed right away, so no verify round trip is needed
+        await client.use_token_manager(dfxapi.TokenManager(on_renewed=on_renewed))
+        return True
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # Couldn't reach the server, the saved tokens may still be renewable later
+        print(f"Your {'user' if using_user_token else 'device'} token has expired and could not be renewed.")
+        print(e)
+        print("Could not reach the server, please check your connection and try again.")
+        return False
+    except ValueError as e:
+        # Renew was rejected
+        print(f"Your {'user' if using_user_token else 'device'} token has expired and could not be renewed.")
+        print(e)
+        print("Attempted token refresh but failed, please register and/or login again!")
 
+        # Erase saved tokens
+        if using_user_token:
+            config["user_token"] = ""
+            config["user_refresh_token"] = ""
+        else:
+            config["device_id"] = ""
+            config["device_token"] = ""
+            config["device_refresh_token"] = ""
+            config["role_id"] = ""
+            config["user_id"] = ""
+        save_config(config, config_file)
 
-async def measure_rest(session, measurement_id, measurement_files, number_chunks, duration_args, found_prop_files):
-    results_expected = number_chunks
+        # Exit since we cannot continue
+        return False
 
-    async def send_chunks():
-        for i, (payload_file, prop_file) in enumerate(measurement_files):
-            with open(payload_file, 'rb') as p, open(prop_file, 'r') as pr:
-                payload_bytes = p.read()
-
-                duration = duration_args
-                if found_prop_files:
-                    props = json.load(pr)
-                    if "duration_s" not in props:
-                        props["duration_s"] = props["end_time_s"] - props["start_time_s"]
-                    duration = props["duration_s"]
-                    number_chunks = props["number_chunks"]
-                    chunk_number = props["chunk_number"]
-                else:
-                    chunk_number = i
-
-                # Determine action
-                action = determine_action(chunk_number, number_chunks)
 
-                # Add data
-                status, add_data_res = await dfxapi.Measurements.add_data(session, measurement_id, action, payload_bytes)
-                chunkID = add_data_res["ID"]
-                print(f"Sent chunk id#:{chunkID} - {action} ...waiting {duration:.0f} seconds...")
+async def measure_rest(client: dfxapi.DfxClient, measurement_id, payloads, body_type="json"):
+    results_expected = payloads.number_chunks
+
+    # Polls for each chunk's result around when it is expected, backing off while it isn't there yet
+    poller = dfxapi.ResultPoller(client.session, retrieve_intermediate=client.measurements.retrieve_intermediate)
+    result_futures = asyncio.Queue()
 
-                # Sleep to simulate a live measurement and not hit the rate limit
-                await asyncio.sleep(duration)
+    async def send_chunks():
+        # Chunks are read off the event loop, the next one while the current one is being sent
+        async for chunk in payloads.chunks():
+            # Add data, through the client so an expired token is renewed and the chunk resent
+            status, add_data_res = await client.measurements.add_data(measurement_id,
+                                                                      chunk.action,
+                                                                      chunk.payload,
+                                                                      chunk_order=chunk.chunk_order,
+                                                                      body_type=body_type,
+                                                                      raise_for_status=True)
+            chunkID = add_data_res["ID"]
+            print(f"Sent chunk id#:{chunkID} - {chunk.action} ...waiting {chunk.duration_s:.0f} seconds...")
+            result_futures.put_nowait(poller.expect(measurement_id, chunk.chunk_order, chunk.duration_s))
+
+            # Sleep to simulate a live measurement
+            await asyncio.sleep(chunk.duration_s)
 
     async def receive_results():
-        # Coroutine to receive results
-        num_results_received = 0
+        # Coroutine to receive results, in the order the chunks were sent
+        for _ in range(results_expected):
+            response = await (await result_futures.get())
+            print(f" Received and decoded result: {response}")
+
+    # Start the two coroutines and await till they finish
+    async with poller:
+        await asyncio.gather(send_chunks(), receive_results())
+    print(f"Polling: {poller.stats}")
+
+
+async def measure_batch(client: dfxapi.DfxClient, args, config):
+    ingestion = dfxapi.BulkIngestion(config["selected_study"],
+                                     concurrency=args.concurrency,
+                                     connections=args.connections,
+                                     processes=args.processes,
+                                     user_profile_id=args.user_profile_id,
+                                     partner_id=args.partner_id,
+                                     chunk_duration_s=args.chunk_duration_s,
+                                     realtime=args.realtime,
+                                     latency_tracker=dfxapi.ChunkLatencyTracker())
+
+    start = time.perf_counter()
+    if args.processes > 1:
+        headers = {"Authorization": client.session.headers["Authorization"]}
+        outcomes = await ingestion.run_in_processes(args.payloads_folders, headers)
+    else:
+        outcomes = await ingestion.run(client.session, args.payloads_folders)
+    summary = ingestion.summary(outcomes, time.perf_counter() - start)
+    if args.processes == 1:
+        # Worker processes each have their own tracker, so only the per-measurement percentiles make it back
+        summary.update({f"Latency{key}": value for key, value in ingestion.latency_tracker.stats().items()})
+
+    outcomes = [outcome.as_dict() for outcome in outcomes]
+    if args.json:
+        print(json.dumps({"Outcomes": outcomes, "Summary": summary}))
+    else:
+        print_pretty(outcomes, args.csv)
+        print_pretty(summary, args.csv)
 
-        # receive results via polling REST every 5 seconds
-        while num_results_received < results_expected:
-            # Sleep to simulate a live measurement and not hit the rate limit
-            await asyncio.sleep(5)
+    last_ok = [outcome["measurement_id"] for outcome in outcomes if outcome["ok"]]
+    if last_ok:
+        config["last_measurement"] = last_ok[-1]
+        save_config(config, args.config_file)
 
-            status, response = await dfxapi.Measurements.retrieve_intermediate(session, measurement_id, num_results_received)
-            if response != {}:
-                print(f" Received and decoded result: {response}")
-                num_results_received += 1
-            else:
-                print("Too early", response)
 
-    # Start the two coroutines and await till they finish
-    await asyncio.gather(send_chunks(), receive_results())
+async def measure_export(client: dfxapi.DfxClient, args):
+    try:
+        dfxapi.ResultsExport.format_of(args.output)
+    except (ImportError, ValueError) as e:
+        print(e)
+        return
 
+    measurement_ids = args.measurement_ids
+    if not measurement_ids:
+        measurement_ids = [
+            row["ID"] async for row in dfxapi.Paginator(client.measurements.list, max_items=args.limit)
+        ]
+
+    export = dfxapi.ResultsExport(concurrency=args.concurrency, organization=args.organization, layout=args.layout)
+    start = time.perf_counter()
+    await export.fetch(client.session, measurement_ids, request_tracer=client.request_tracer)
+    export.write(args.output)
+
+    summary = {
+        "Output": args.output,
+        "Measurements": export.measurements,
+        "Signals": len(export.signals),
+        "Rows": export.rows,
+        "Failed": len(export.errors),
+        "ElapsedSeconds": round(time.perf_counter() - start, 3),
+    }
+    print(json.dumps({"Summary": summary, "Errors": export.errors})) if args.json else print_pretty(summary, args.csv)
 
-async def measure_websocket(session: aiohttp.ClientSession, measurement_id, measurement_files, number_chunks,
-                            duration_args, found_prop_files):
-    # Use the session to connect to the WebSocket
-    async with dfxapi.Measurements.ws_connect(session) as ws:
-        # Auth using `ws_auth_with_token` if headers cannot be manipulated
-        if "Authorization" not in session.headers:
-            await dfxapi.Organizations.ws_auth_with_token(ws, generate_reqid())
-            await ws.receive()  # Wait to receive response before proceeding..
 
+async def measure_websocket(dfx_client: dfxapi.DfxClient, measurement_id, payloads):
+    # Use the client's session to connect to the WebSocket. If the connection drops, the WebSocketSession reconnects,
+    # redoes `ws_auth_with_token` (used if headers cannot be manipulated) and the subscription, and resends the chunks
+    # that didn't get a result yet. Reconnects use the session's current token, which the TokenManager keeps renewed
+    latency_tracker = dfxapi.ChunkLatencyTracker()
+    async with dfxapi.WebSocketSession(dfx_client.session, latency_tracker=latency_tracker) as client:
         # Subscribe to results
-        results_request_id = generate_reqid()
-        await dfxapi.Measurements.ws_subscribe_to_results(ws, generate_reqid(), measurement_id, results_request_id)
+        results = await client.subscribe(measurement_id)
 
-        # Use this to close WebSocket in the receive loop
-        results_expected = number_chunks
+        # Use this to stop the receive loop
+        results_expected = payloads.number_chunks
 
         async def send_chunks():
-            number_chunks = results_expected
-            # Coroutine to iterate through the payload files and send chunks using WebSocket
-            for i, (payload_file, prop_file) in enumerate(measurement_files):
-                with open(payload_file, 'rb') as p, open(prop_file, 'r') as pr:
-                    payload_bytes = p.read()
-
-                    duration = duration_args
-                    if found_prop_files:
-                        props = json.load(pr)
-                        if "duration_s" not in props:
-                            props["duration_s"] = props["end_time_s"] - props["start_time_s"]
-                        duration = props["duration_s"]
-                        number_chunks = props["number_chunks"]
-                        chunk_number = props["chunk_number"]
-                    else:
-                        chunk_number = i
-
-                    # Determine action and request id
-                    action = determine_action(chunk_number, number_chunks)
-                    request_id = generate_reqid()
-
-                    # Add data
-                    await dfxapi.Measurements.ws_add_data(ws, request_id, measurement_id, action, payload_bytes)
-                    sleep_time = max(duration, duration_args)
-                    print(f"Sent chunk req#:{request_id} - {action} ...waiting {sleep_time:.0f} seconds...")
-
-                    # Sleep to simulate a live measurement and not hit the rate limit
-                    await asyncio.sleep(sleep_time)
+            # Coroutine to iterate through the payload chunks and send them using WebSocket
+            async for chunk in payloads.chunks():
+                # Add data
+                await client.add_data(measurement_id, chunk.action, chunk.payload, chunk_order=chunk.chunk_order)
+                print(f"Sent chunk {chunk.chunk_order} - {chunk.action} ...waiting {chunk.duration_s:.0f} seconds...")
+
+                # Sleep to simulate a live measurement
+                await asyncio.sleep(chunk.duration_s)
 
         async def receive_results():
             # Coroutine to receive results
             num_results_received = 0
-            async for msg in ws:
-                _, request_id, payload = dfxapi.Measurements.ws_decode(msg)
-                if request_id == results_request_id:
-                    response = json.loads(payload)
+            async with results:
+                async for response in results:
                     print(f" Received and decoded result: {response}")
+                    print(f" Chunk latency: {latency_tracker.stats(measurement_id)}")
                     num_results_received += 1
-                if num_results_received == results_expected:
-                    await ws.close()
-                    break
+                    if num_results_received == results_expected:
+                        break
 
         # Start the two coroutines and await till they finish
         await asyncio.gather(send_chunks(), receive_results())
@@ -514,6 +504,7 @@ async def measure_websocket(session: aiohttp.ClientSession, measurement_id, meas
 def cmdline():
     parser = argparse.ArgumentParser()
     parser.add_argument("-c", "--config_file", default="./config.json")
+    parser.add_argument("--timings", help="Print REST request timings by endpoint and phase", action="store_true")
     pp_group = parser.add_mutually_exclusive_group()
     pp_group.add_argument("--json", help="Print as JSON", action="store_true", default=False)
     pp_group.add_argument("--csv", help="Print grids as CSV", action="store_true", default=False)
@@ -560,22 +551,62 @@ def cmdline():
     study_file_parser = subparser_studies.add_parser("get_sdk_cfg_data",
                                                      help="Retrieve a study config file to use with DFX SDK")
     study_file_parser.add_argument("sdk_id", help="DFX SDK ID", type=str)
-    study_file_parser.add_argument("current_hash", help="Current hash value", type=str)
+    study_file_parser.add_argument("--study_id",
+                                   help="ID of study to retrieve the config for (default: selected study)",
+                                   type=str,
+                                   default=None)
+    study_file_parser.add_argument("--store_folder",
+                                   help="Folder caching config files by hash (default: ./sdk_cfg)",
+                                   type=str,
+                                   default="./sdk_cfg")
 
     subparser_meas = subparser_top.add_parser("measure", help="Measurements").add_subparsers(dest="subcommand",
                                                                                              required=True)
     make_parser = subparser_meas.add_parser("make", help="Make a measurement")
     make_parser.add_argument("payloads_folder", help="Folder containing payloads", type=str)
     make_parser.add_argument("--rest", help="Use REST instead of WebSocket (no results returned)", action="store_true")
+    make_parser.add_argument("--rest_body_type",
+                             help="How REST sends chunks, JSON with base64 payloads or the raw payload",
+                             choices=["json", "octet-stream", "multipart"],
+                             default="json")
     make_parser.add_argument("--user_profile_id", help="Set the Profile ID (Participant ID)", type=str, default="")
     make_parser.add_argument("--partner_id", help="Set the PartnerID", type=str, default="")
     make_parser.add_argument("--chunk_duration_s",
                              help="Chunk duration to use when no property files in payloads folder",
+                             type=float,
                              default=5.0)
+    batch_parser = subparser_meas.add_parser("batch", help="Make many measurements concurrently")
+    batch_parser.add_argument("payloads_folders", help="Folders containing payloads", type=str, nargs="+")
+    batch_parser.add_argument("--concurrency", help="Measurements in flight per process", type=int, default=8)
+    batch_parser.add_argument("--connections", help="WebSocket connections per process", type=int, default=1)
+    batch_parser.add_argument("--processes", help="Worker processes to spread folders across", type=int, default=1)
+    batch_parser.add_argument("--realtime", help="Pace chunks at their duration like a live measurement",
+                              action="store_true")
+    batch_parser.add_argument("--user_profile_id", help="Set the Profile ID (Participant ID)", type=str, default="")
+    batch_parser.add_argument("--partner_id", help="Set the PartnerID", type=str, default="")
+    batch_parser.add_argument("--chunk_duration_s",
+                              help="Chunk duration to use when no property files in payloads folder",
+                              type=float,
+                              default=5.0)
     list_parser = subparser_meas.add_parser("list", help="List existing measurements")
     list_parser.add_argument("--limit", help="Number of measurements to retrieve (default 1)", type=int, default=1)
     list_parser.add_argument("--profile_id", help="Filter list by Profile ID", type=str, default="")
     list_parser.add_argument("--partner_id", help="Filter list by PartnerID", type=str, default="")
+    export_parser = subparser_meas.add_parser("export",
+                                              help="Export measurement results, one column per signal")
+    export_parser.add_argument("measurement_ids",
+                               nargs="*",
+                               help="IDs of measurements to export (default: the latest --limit measurements)")
+    export_parser.add_argument("--output", help="File to write, .parquet, .npz or .csv", default="results.parquet")
+    export_parser.add_argument("--layout",
+                               help="wide: one column per signal, long: one row per signal data point",
+                               choices=dfxapi.ResultsExport.LAYOUTS,
+                               default="wide")
+    export_parser.add_argument("--limit", help="Number of latest measurements to export", type=int, default=100)
+    export_parser.add_argument("--concurrency", help="Measurements retrieved at once", type=int, default=16)
+    export_parser.add_argument("--organization",
+                               help="Use the organization endpoint to export other users' measurements",
+                               action="store_true")
     get_parser = subparser_meas.add_parser("get", help="Retrieve a measurement")
     get_parser.add_argument("measurement_id",
                             nargs="?",
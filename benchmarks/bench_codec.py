@@ -0,0 +1,75 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import argparse
+import json
+import random
+import time
+
+import dfx_apiv2_client as dfxapi
+
+
+def make_list_response(rows):
+    return [{
+        "ID": f"{i:08x}-0000-0000-0000-000000000000",
+        "StudyID": "00000000-0000-0000-0000-000000000000",
+        "StatusID": "COMPLETE",
+        "DeviceID": "00000000-0000-0000-0000-000000000000",
+        "UserProfileID": "",
+        "PartnerID": "partner",
+        "Mode": "DISCRETE",
+        "Region": "na-east",
+        "Created": 1700000000 + i,
+        "Updated": 1700000100 + i,
+    } for i in range(rows)]
+
+
+def make_results_response(signals, samples):
+    signal_ids = [f"SIGNAL_{i}" for i in range(signals)]
+    return {
+        "ID": "00000000-0000-0000-0000-000000000000",
+        "StatusID": "COMPLETE",
+        "Results": {
+            signal_id: [{
+                "Data": [random.randint(0, 100000) for _ in range(samples)],
+                "Multiplier": 1000
+            }]
+            for signal_id in signal_ids
+        },
+        "SignalNames": {signal_id: signal_id.title() for signal_id in signal_ids},
+        "SignalUnits": {signal_id: "bpm" for signal_id in signal_ids},
+    }
+
+
+def timeit(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main(args):
+    cases = {
+        f"list[{args.rows}]": json.dumps(make_list_response(args.rows)).encode('utf-8'),
+        f"results[{args.signals}x{args.samples}]": json.dumps(make_results_response(args.signals,
+                                                                                    args.samples)).encode('utf-8'),
+    }
+
+    print(f"{'codec':>8} {'case':>22} {'loads us':>10} {'dumps us':>10}")
+    for codec in dfxapi.Codec.available():
+        dfxapi.Codec.use(codec)
+        for case, raw in cases.items():
+            obj = dfxapi.Codec.loads(raw)
+            loads = timeit(lambda: dfxapi.Codec.loads(raw), args.iterations)
+            dumps = timeit(lambda: dfxapi.Codec.dumps(obj), args.iterations)
+            print(f"{codec:>8} {case:>22} {loads * 1e6:>10.1f} {dumps * 1e6:>10.1f}")
+    dfxapi.Codec.use()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the JSON codecs available to dfx_apiv2_client.Codec")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--signals", type=int, default=40)
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=50)
+    main(parser.parse_args())
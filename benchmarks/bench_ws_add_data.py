@@ -0,0 +1,66 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+import dfx_apiv2_client as dfxapi
+
+
+class NullWebSocket:
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send_str(self, data):
+        self.bytes_sent += len(data)
+
+    async def send_bytes(self, data):
+        self.bytes_sent += len(data)
+
+
+async def run_one(payload, binary, iterations):
+    ws = NullWebSocket()
+    start = time.perf_counter()
+    for i in range(iterations):
+        await dfxapi.Measurements.ws_add_data(ws,
+                                              "abcdefghij",
+                                              "00000000-0000-0000-0000-000000000000",
+                                              "CHUNK::PROCESS",
+                                              payload,
+                                              chunk_order=i,
+                                              duration_s="5",
+                                              binary=binary)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await dfxapi.Measurements.ws_add_data(ws,
+                                          "abcdefghij",
+                                          "00000000-0000-0000-0000-000000000000",
+                                          "CHUNK::PROCESS",
+                                          payload,
+                                          binary=binary)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / iterations, ws.bytes_sent / (iterations + 1), peak
+
+
+async def main(args):
+    print(f"{'size':>10} {'mode':>6} {'us/chunk':>10} {'MB/s':>8} {'wire bytes':>12} {'peak alloc':>12}")
+    for size in args.sizes:
+        payload = memoryview(os.urandom(size))
+        for binary in (False, True):
+            per_chunk, wire, peak = await run_one(payload, binary, args.iterations)
+            mode = "binary" if binary else "text"
+            print(f"{size:>10} {mode:>6} {per_chunk * 1e6:>10.1f} {size / per_chunk / 1e6:>8.1f} {wire:>12.0f} "
+                  f"{peak:>12}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare text and binary framing of Measurements.ws_add_data")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[64 * 1024, 512 * 1024, 4 * 1024 * 1024])
+    parser.add_argument("--iterations", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,261 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+# Runs every client hot path benchmark, writes the results as JSON and compares them against a stored baseline.
+# The baseline is only comparable on the host that recorded it, so record one first on a new host or CI runner:
+#
+#   python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+#   python -m benchmarks.suite --output results.json --baseline benchmarks/baseline.json
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+import dfx_apiv2_client as dfxapi
+from benchmarks.bench_codec import make_list_response
+from benchmarks.bench_ws_add_data import NullWebSocket
+from dfx_apiv2_client.LocalServer import LocalServer
+
+MEASUREMENT_ID = "00000000-0000-0000-0000-000000000000"
+
+# Absolute timings are only comparable between runs where all of these match
+HOST_KEYS = ("python", "platform", "machine", "processor", "cpu_count", "aiohttp", "codec")
+
+
+def best_of(fn, iterations, repeat):
+    # The minimum of several runs is the least noisy estimate of the cost itself
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+
+async def best_of_async(fn, iterations, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await fn()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+
+def bench_ws_encode(results, args):
+    for size in args.sizes:
+        payload = memoryview(os.urandom(size))
+        for mode, encode in (("text", dfxapi.Measurements.ws_encode_add_data),
+                             ("binary", dfxapi.Measurements.ws_encode_add_data_binary)):
+            per_op = best_of(
+                lambda: encode("abcdefghij", MEASUREMENT_ID, "CHUNK::PROCESS", payload, chunk_order=1, duration_s="5"),
+                max(args.iterations * 64 * 1024 // size, 10), args.repeat)
+            results[f"ws_add_data.encode.{mode}.{size}"] = {"us_per_op": per_op * 1e6, "bytes": size}
+
+
+async def bench_ws_send(results, args):
+    payload = memoryview(os.urandom(args.sizes[0]))
+    ws = NullWebSocket()
+    for mode, binary in (("text", False), ("binary", True)):
+        per_op = await best_of_async(
+            lambda: dfxapi.Measurements.ws_add_data(
+                ws, "abcdefghij", MEASUREMENT_ID, "CHUNK::PROCESS", payload, chunk_order=1, binary=binary),
+            args.iterations, args.repeat)
+        results[f"ws_add_data.send.{mode}.{args.sizes[0]}"] = {"us_per_op": per_op * 1e6, "bytes": args.sizes[0]}
+
+
+def bench_ws_decode(results, args):
+    for size in (64, 16 * 1024):
+        body = json.dumps({"ID": MEASUREMENT_ID, "Data": "x" * size}).encode()
+        msg = aiohttp.WSMessage(aiohttp.WSMsgType.BINARY, b"abcdefghij200" + body, None)
+        per_op = best_of(lambda: dfxapi.Measurements.ws_decode(msg), args.iterations * 10, args.repeat)
+        results[f"ws_decode.{size}"] = {"us_per_op": per_op * 1e6, "bytes": len(msg.data)}
+        per_op = best_of(lambda: dfxapi.Measurements.ws_decode_frame(msg).request_id, args.iterations * 10,
+                         args.repeat)
+        results[f"ws_decode_frame.header.{size}"] = {"us_per_op": per_op * 1e6, "bytes": len(msg.data)}
+
+
+def bench_list_parse(results, args):
+    raw = json.dumps(make_list_response(args.rows)).encode()
+    per_op = best_of(lambda: dfxapi.Codec.loads(raw), max(args.iterations // 10, 5), args.repeat)
+    results[f"list_parse.{dfxapi.Codec.name}.{args.rows}"] = {"us_per_op": per_op * 1e6, "bytes": len(raw)}
+
+
+async def bench_rest(results, args, session):
+    for _ in range(args.rows):
+        await dfxapi.Measurements.create(session, "study-0")
+
+    per_op = await best_of_async(lambda: dfxapi.Measurements.create(session, "study-0"), args.iterations,
+                                 args.repeat)
+    results["rest.post.round_trip"] = {"us_per_op": per_op * 1e6}
+
+    per_op = await best_of_async(lambda: dfxapi.General.api_status(session), args.iterations, args.repeat)
+    results["rest.get.round_trip"] = {"us_per_op": per_op * 1e6}
+
+    per_op = await best_of_async(lambda: dfxapi.Measurements.list(session, limit=args.rows), max(
+        args.iterations // 10, 5), args.repeat)
+    results[f"rest.get.list.{args.rows}"] = {"us_per_op": per_op * 1e6}
+
+    async def list_streamed():
+        _, rows = await dfxapi.Measurements.list(session, limit=args.rows, stream=True)
+        async for _ in rows:
+            pass
+
+    per_op = await best_of_async(list_streamed, max(args.iterations // 10, 5), args.repeat)
+    results[f"rest.get.list.stream.{args.rows}"] = {"us_per_op": per_op * 1e6}
+
+    _, measurement = await dfxapi.Measurements.create(session, "study-0")
+    for size in args.sizes:
+        payload = memoryview(os.urandom(size))
+        for body_type in ("json", "octet-stream", "multipart"):
+            per_op = await best_of_async(
+                lambda: dfxapi.Measurements.add_data(
+                    session, measurement["ID"], "CHUNK::PROCESS", payload, chunk_order=1, body_type=body_type),
+                max(args.iterations * 64 * 1024 // size // 10, 5), args.repeat)
+            results[f"rest.add_data.{body_type}.{size}"] = {"us_per_op": per_op * 1e6, "bytes": size}
+
+
+def bench_sync(results, args):
+    # Blocking callers reuse the background loop's session instead of a new loop and session per call
+    with dfxapi.SyncClient() as client:
+        per_op = best_of(client.general.api_status, args.iterations, args.repeat)
+    results["sync.get.round_trip"] = {"us_per_op": per_op * 1e6}
+
+    async def api_status():
+        async with dfxapi.DfxClient() as client:
+            await client.general.api_status()
+
+    per_op = best_of(lambda: asyncio.run(api_status()), max(args.iterations // 10, 5), args.repeat)
+    results["sync.get.asyncio_run"] = {"us_per_op": per_op * 1e6}
+
+
+async def bench_end_to_end(results, args, session):
+    with tempfile.TemporaryDirectory() as folder:
+        for chunk in range(args.chunks):
+            with open(os.path.join(folder, f"payload{chunk:03d}.bin"), "wb") as f:
+                f.write(os.urandom(args.sizes[0]))
+
+        ingestion = dfxapi.BulkIngestion("study-0", concurrency=args.measurements, binary=True)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outcomes = await ingestion.run(session, [folder] * args.measurements)
+            best = min(best, time.perf_counter() - start)
+            if not all(outcome.ok for outcome in outcomes):
+                raise RuntimeError(f"End-to-end benchmark failed: {[o.error for o in outcomes if not o.ok]}")
+
+    chunks = args.measurements * args.chunks
+    results[f"end_to_end.{args.measurements}x{args.chunks}"] = {
+        "us_per_op": best / chunks * 1e6,
+        "chunks_per_s": chunks / best,
+    }
+
+
+async def run(args):
+    results = {}
+    bench_ws_encode(results, args)
+    await bench_ws_send(results, args)
+    bench_ws_decode(results, args)
+    bench_list_parse(results, args)
+
+    async with LocalServer() as server:
+        dfxapi.Settings.rest_url, dfxapi.Settings.ws_url = server.rest_url, server.ws_url
+        async with dfxapi.DfxClient() as client:
+            await bench_rest(results, args, client.session)
+            await bench_end_to_end(results, args, client.session)
+        # Run from another thread, since they block while this loop serves them
+        await asyncio.get_running_loop().run_in_executor(None, bench_sync, results, args)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<40} {'-':>12} {result['us_per_op']:>12.2f} {'new':>8}")
+            continue
+        change = result["us_per_op"] / base["us_per_op"] - 1
+        flag = " REGRESSED" if change > threshold else ""
+        print(f"{name:<40} {base['us_per_op']:>12.2f} {result['us_per_op']:>12.2f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def host_mismatches(meta, baseline_meta):
+    return [(key, baseline_meta.get(key), meta.get(key))
+            for key in HOST_KEYS
+            if baseline_meta.get(key) != meta.get(key)]
+
+
+def main(args):
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "aiohttp": aiohttp.__version__,
+            "codec": dfxapi.Codec.name,
+            "time": int(time.time()),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline and os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        mismatches = host_mismatches(report["meta"], baseline.get("meta", {}))
+        if mismatches:
+            for key, base, current in mismatches:
+                print(f"Baseline {key} {base!r} != {current!r}")
+            print("The baseline was recorded on a different host, so regressions were not checked; record one for this "
+                  "host with --save-baseline")
+            if not args.allow_host_mismatch:
+                sys.exit(2)
+            return
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+    else:
+        for name, result in results.items():
+            print(f"{name:<40} {result['us_per_op']:>12.2f} us")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the dfx_apiv2_client hot paths")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this JSON file", default="benchmarks/baseline.json")
+    parser.add_argument("--save-baseline", help="Write the results as the new baseline to this JSON file")
+    parser.add_argument("--threshold", help="Fail when a benchmark is this much slower", type=float, default=0.25)
+    parser.add_argument("--allow-host-mismatch",
+                        help="Succeed without checking regressions when the baseline is from a different host",
+                        action="store_true")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 64 * 1024, 1024 * 1024])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--measurements", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=6)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
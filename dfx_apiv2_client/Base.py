@@ -1,39 +1,39 @@
 # Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
 # See LICENSE.txt in the project root for license information
 
-import json
-from typing import Any, Tuple, Union
+import asyncio
+import contextlib
+import functools
+from typing import Any, Mapping, Optional, Tuple, Union
 
 import aiohttp
 
+from .Codec import Codec
+from .JsonArrayStream import JsonArrayStream
+from .RequestTracer import RequestTracer
+from .ResponseCache import ResponseCache
+from .RetryPolicy import RetryPolicy
 from .Settings import Settings
+from .WebSocketFrame import WebSocketFrame
 
 
 class Base:
+    retry_policy: Optional[RetryPolicy] = None
+    response_cache: Optional[ResponseCache] = None
+    request_tracer: Optional[RequestTracer] = None
+
     @classmethod
     async def _get(cls, session: aiohttp.ClientSession, url_fragment: str, params: dict = None, **kwargs: Any) -> Any:
-        url = f"{Settings.rest_url}/{url_fragment}"
-
-        async with session.get(url, params=params, **kwargs) as resp:
-            if resp.content_type != "application/json":
-                return resp.status, await resp.read()
-            else:
-                return resp.status, await resp.json()
+        return await cls._request(session, "GET", url_fragment, params=params, **kwargs)
 
     @classmethod
     async def _post(cls, session: aiohttp.ClientSession, url_fragment: str, data: Union[dict, list],
                     **kwargs: Any) -> Any:
-        url = f"{Settings.rest_url}/{url_fragment}"
-
-        async with session.post(url, json=data, **kwargs) as resp:
-            return resp.status, await resp.json()
+        return await cls._request(session, "POST", url_fragment, data=cls._json_payload(data), **kwargs)
 
     @classmethod
     async def _patch(cls, session: aiohttp.ClientSession, url_fragment: str, data: dict, **kwargs: Any) -> Any:
-        url = f"{Settings.rest_url}/{url_fragment}"
-
-        async with session.patch(url, json=data, **kwargs) as resp:
-            return resp.status, await resp.json()
+        return await cls._request(session, "PATCH", url_fragment, data=cls._json_payload(data), **kwargs)
 
     @classmethod
     async def _delete(cls,
@@ -41,13 +41,102 @@ class Base:
                       url_fragment: str,
                       data: Union[dict, list] = None,
                       **kwargs: Any) -> Any:
+        return await cls._request(session, "DELETE", url_fragment, data=cls._json_payload(data), **kwargs)
+
+    @classmethod
+    async def _request(cls, session: aiohttp.ClientSession, method: str, url_fragment: str, **kwargs: Any) -> Any:
         url = f"{Settings.rest_url}/{url_fragment}"
+        retry_policy = cls._option(kwargs.pop("retry_policy", None), cls.retry_policy, Settings.retry_policy)
+        cache_as = kwargs.pop("cache_as", None)
+        invalidates = kwargs.pop("invalidates", None)
+        response_cache = cls._option(kwargs.pop("response_cache", None), cls.response_cache, Settings.response_cache)
+        request_tracer = cls._option(kwargs.pop("request_tracer", None), cls.request_tracer, Settings.request_tracer)
+        stream = kwargs.pop("stream", False)
+
+        send = functools.partial(cls._send, session, method, url, retry_policy, request_tracer, stream)
+        if method == "GET" and cache_as is not None and response_cache is not None and not stream:
+            return await response_cache.fetch(cache_as, session, url, kwargs, send)
+
+        try:
+            status, body, _ = await send(**kwargs)
+        finally:
+            # A write may have gone through even when its response didn't make it back
+            if invalidates is not None and response_cache is not None:
+                response_cache.invalidate(invalidates, url)
+        return status, body
+
+    @staticmethod
+    def _option(*values: Any) -> Any:
+        # The first one that is set, per call, then per class, then in Settings. An empty cache or a policy that
+        # happens to be falsy still counts as set
+        return next((value for value in values if value is not None), None)
+
+    @classmethod
+    async def _send(cls, session: aiohttp.ClientSession, method: str, url: str, retry_policy: Optional[RetryPolicy],
+                    request_tracer: Optional[RequestTracer], stream: bool,
+                    **kwargs: Any) -> Tuple[int, Any, Mapping[str, str]]:
+        attempt = 0
+        while True:
+            if retry_policy is not None:
+                retry_policy.attempts += 1
+            timing = request_tracer.start(cls.__name__, method, attempt) if request_tracer is not None else None
+            try:
+                async with contextlib.AsyncExitStack() as stack:
+                    resp = await stack.enter_async_context(
+                        session.request(method, url, trace_request_ctx=timing, **kwargs))
+                    if timing is not None:
+                        timing.status = resp.status
+                    delay = None
+                    if retry_policy is not None and resp.status >= 400:
+                        delay = retry_policy.delay(attempt, method, resp.status, resp.headers)
+                    if delay is None:
+                        if stream and 200 <= resp.status < 300 and resp.content_type == "application/json":
+                            # The stream owns the response from here and releases it once read or closed
+                            stack.pop_all()
+                            body = JsonArrayStream(resp)
+                            if timing is not None:
+                                body.on_close = functools.partial(request_tracer.finish, timing)
+                                timing = None
+                            return resp.status, body, resp.headers
+                        return resp.status, await cls._read_body(method, resp), resp.headers
+            except aiohttp.ClientResponseError as e:
+                # Raised instead of returned when the session or call uses raise_for_status
+                if timing is not None:
+                    timing.status = e.status
+                delay = retry_policy.delay(attempt, method, e.status, e.headers) if retry_policy is not None else None
+                if delay is None:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = retry_policy.delay(attempt, method, exception=e) if retry_policy is not None else None
+                if delay is None:
+                    raise
+            finally:
+                if timing is not None:
+                    request_tracer.finish(timing)
+
+            retry_policy.record(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
 
-        async with session.delete(url, json=data, **kwargs) as resp:
-            return resp.status, await resp.json()
+    @classmethod
+    async def _read_body(cls, method: str, resp: aiohttp.ClientResponse) -> Any:
+        if resp.status == 304:
+            return None
+        if method != "GET":
+            return await resp.json(loads=Codec.loads)
+
+        body = await resp.read()
+        if resp.content_type != "application/json":
+            return body
+        else:
+            return Codec.loads(body) if body else None
 
     @classmethod
-    def ws_decode(cls, msg: aiohttp.WSMessage) -> Tuple[int, str, bytes]:
+    def _json_payload(cls, data: Optional[Union[dict, list]]) -> Optional[aiohttp.JsonPayload]:
+        return aiohttp.JsonPayload(data, dumps=Codec.dumps) if data is not None else None
+
+    @classmethod
+    def ws_decode(cls, msg: aiohttp.WSMessage, raise_for_status: bool = True) -> Tuple[int, str, bytes]:
         if msg.type != aiohttp.WSMsgType.BINARY:
             raise ValueError("WebSocket error: Expecting only binary websocket responses")
         result = msg.data
@@ -55,18 +144,30 @@ class Base:
         status = int(result[10:13].decode('utf-8'))
         payload = result[13:].decode('utf-8')
 
-        # TODO: Handle raise_for_status == False
+        if raise_for_status:
+            cls.ws_raise_for_status(status, request_id, payload)
+
+        return status, request_id, payload
+
+    @classmethod
+    def ws_decode_frame(cls, msg: aiohttp.WSMessage) -> WebSocketFrame:
+        if msg.type != aiohttp.WSMsgType.BINARY:
+            raise ValueError("WebSocket error: Expecting only binary websocket responses")
+        return WebSocketFrame(msg.data)
+
+    @classmethod
+    def ws_raise_for_status(cls, status: int, request_id: str, payload: str) -> None:
         if status >= 400:
             try:
-                error = json.loads(payload)
+                error = Codec.loads(payload)
             except Exception as e:
                 raise ValueError(
                     f"WebSocket error: API Status {status} for req#:{request_id}, could not parse response as JSON"
                 ) from e
-            raise ValueError(f"WebSocket error: API Status {status} for req#:{request_id}, Code: {error['Code']}, "
-                             f"Description: '{error['Errors'] if 'Errors' in error else None}'.")
-
-        return status, request_id, payload
+            if not isinstance(error, dict):
+                error = {}  # Still an error, just one without details
+            raise ValueError(f"WebSocket error: API Status {status} for req#:{request_id}, Code: {error.get('Code')}, "
+                             f"Description: '{error.get('Errors')}'.")
 
     @classmethod
     def ws_connect(cls, session: aiohttp.ClientSession, **kwargs: Any):
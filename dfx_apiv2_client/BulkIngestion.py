@@ -0,0 +1,183 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import aiohttp
+
+from .ChunkLatencyTracker import ChunkLatencyTracker
+from .DfxClient import DfxClient
+from .Measurements import Measurements
+from .PayloadFolder import PayloadFolder
+from .Settings import Settings
+from .WebSocketMultiplexer import WebSocketMultiplexer
+
+
+class IngestionOutcome:
+    __slots__ = ("folder", "measurement_id", "ok", "error", "chunks_sent", "results_received", "bytes_sent",
+                 "elapsed_s", "p50_ms", "p95_ms", "p99_ms")
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.measurement_id = ""
+        self.ok = False
+        self.error = ""
+        self.chunks_sent = 0
+        self.results_received = 0
+        self.bytes_sent = 0
+        self.elapsed_s = 0.0
+        # Send-to-result latency, only measured when BulkIngestion has a latency_tracker
+        self.p50_ms = 0.0
+        self.p95_ms = 0.0
+        self.p99_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BulkIngestion:
+    def __init__(self,
+                 study_id: str,
+                 concurrency: int = 8,
+                 connections: int = 1,
+                 processes: int = 1,
+                 user_profile_id: str = "",
+                 partner_id: str = "",
+                 chunk_duration_s: float = 5.0,
+                 realtime: bool = False,
+                 binary: bool = False,
+                 results_timeout_s: float = 120.0,
+                 latency_tracker: Optional[ChunkLatencyTracker] = None,
+                 send_queue_bytes: Optional[int] = None):
+        if concurrency < 1 or connections < 1 or processes < 1:
+            raise ValueError("BulkIngestion concurrency, connections and processes must be at least 1")
+        self.study_id = study_id
+        self.concurrency = concurrency
+        self.connections = connections
+        self.processes = processes
+        self.user_profile_id = user_profile_id
+        self.partner_id = partner_id
+        self.chunk_duration_s = chunk_duration_s
+        self.realtime = realtime
+        self.binary = binary
+        self.results_timeout_s = results_timeout_s
+        self.latency_tracker = latency_tracker
+        self.send_queue_bytes = send_queue_bytes  # Bounds the frames buffered per connection when the uplink is slow
+
+    async def run(self, session: aiohttp.ClientSession, folders: Sequence[str]) -> List[IngestionOutcome]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(folder: str) -> IngestionOutcome:
+            async with semaphore:
+                return await self._ingest(session, mux, folder)
+
+        async with WebSocketMultiplexer(session, connections=self.connections,
+                                        latency_tracker=self.latency_tracker,
+                                        send_queue_bytes=self.send_queue_bytes) as mux:
+            return await asyncio.gather(*[bounded(folder) for folder in folders])
+
+    async def run_in_processes(self, folders: Sequence[str], headers: Optional[dict] = None) -> List[IngestionOutcome]:
+        # Each worker process gets its own event loop, session and WebSocket connections
+        shards = [list(folders[i::self.processes]) for i in range(self.processes)]
+        settings = {k: v for k, v in vars(Settings).items() if not k.startswith("_")}
+
+        loop = asyncio.get_running_loop()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.processes) as pool:
+            results = await asyncio.gather(
+                *[loop.run_in_executor(pool, _run_shard, self, settings, headers, shard) for shard in shards])
+
+        # Undo the round-robin split so outcomes line up with `folders`
+        outcomes: List[IngestionOutcome] = [None] * len(folders)
+        for i, shard in enumerate(results):
+            outcomes[i::self.processes] = shard
+        return outcomes
+
+    @staticmethod
+    def summary(outcomes: Sequence[IngestionOutcome], elapsed_s: float) -> Dict[str, Any]:
+        succeeded = sum(1 for outcome in outcomes if outcome.ok)
+        chunks = sum(outcome.chunks_sent for outcome in outcomes)
+        bytes_sent = sum(outcome.bytes_sent for outcome in outcomes)
+        return {
+            "Measurements": len(outcomes),
+            "Succeeded": succeeded,
+            "Failed": len(outcomes) - succeeded,
+            "Chunks": chunks,
+            "MegaBytes": round(bytes_sent / 1e6, 3),
+            "ElapsedSeconds": round(elapsed_s, 3),
+            "MeasurementsPerSecond": round(len(outcomes) / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "ChunksPerSecond": round(chunks / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "MegaBytesPerSecond": round(bytes_sent / 1e6 / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+        }
+
+    async def _ingest(self, session: aiohttp.ClientSession, mux: WebSocketMultiplexer,
+                      folder: str) -> IngestionOutcome:
+        outcome = IngestionOutcome(folder)
+        start = time.perf_counter()
+        try:
+            payloads = PayloadFolder(folder, self.chunk_duration_s)
+            payloads.validate()
+
+            status, body = await Measurements.create(session,
+                                                     self.study_id,
+                                                     user_profile_id=self.user_profile_id,
+                                                     partner_id=self.partner_id)
+            if status >= 400:
+                raise ValueError(f"Could not create measurement: API Status {status}, response: {body}")
+            outcome.measurement_id = body["ID"]
+
+            client = mux.client()
+            async with await client.subscribe(outcome.measurement_id) as results:
+
+                async def receive_results() -> None:
+                    async for _ in results:
+                        outcome.results_received += 1
+                        if outcome.results_received == payloads.number_chunks:
+                            break
+
+                receiver = asyncio.ensure_future(receive_results())
+                try:
+                    async for chunk in payloads.chunks():
+                        await client.add_data(outcome.measurement_id,
+                                              chunk.action,
+                                              chunk.payload,
+                                              chunk_order=chunk.chunk_order,
+                                              binary=self.binary)
+                        outcome.chunks_sent += 1
+                        outcome.bytes_sent += len(chunk.payload)
+                        if self.realtime:
+                            await asyncio.sleep(chunk.duration_s)
+                    await asyncio.wait_for(asyncio.shield(receiver), self.results_timeout_s)
+                finally:
+                    receiver.cancel()
+
+            outcome.ok = outcome.results_received == payloads.number_chunks
+            if not outcome.ok:
+                # The subscription ended early, e.g. the WebSocket closed
+                outcome.error = (f"Connection closed after {outcome.results_received}/{payloads.number_chunks} "
+                                 f"results")
+            if self.latency_tracker is not None:
+                latency = self.latency_tracker.stats(outcome.measurement_id)
+                outcome.p50_ms, outcome.p95_ms, outcome.p99_ms = latency["P50Ms"], latency["P95Ms"], latency["P99Ms"]
+        except asyncio.TimeoutError:
+            outcome.error = f"Timed out waiting for results ({outcome.results_received} received)"
+        except Exception as e:
+            outcome.error = f"{type(e).__name__}: {e}"
+        outcome.elapsed_s = time.perf_counter() - start
+        return outcome
+
+
+def _run_shard(ingestion: BulkIngestion, settings: Dict[str, Any], headers: Optional[dict],
+               folders: List[str]) -> List[IngestionOutcome]:
+    for k, v in settings.items():
+        setattr(Settings, k, v)
+
+    async def run() -> List[IngestionOutcome]:
+        if not folders:
+            return []
+        async with DfxClient(headers=headers) as client:
+            return await ingestion.run(client.session, folders)
+
+    return asyncio.run(run())
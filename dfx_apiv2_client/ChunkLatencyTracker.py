@@ -0,0 +1,119 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import collections
+import time
+from typing import Any, Deque, Dict, Iterable, List, Optional, OrderedDict
+
+
+class _MeasurementLatencies:
+    __slots__ = ("sent_at", "latencies_s", "next_chunk_order")
+
+    def __init__(self, window: int):
+        self.sent_at: OrderedDict[int, float] = collections.OrderedDict()
+        self.latencies_s: Deque[float] = collections.deque(maxlen=window)
+        self.next_chunk_order = 0
+
+
+class ChunkLatencyTracker:
+    def __init__(self, window: int = 1000, max_measurements: int = 1000):
+        self.window = window
+        self.max_measurements = max_measurements
+        self.latencies_s: Deque[float] = collections.deque(maxlen=window)
+        self.sent_count = 0
+        self.received_count = 0
+        self.unmatched_count = 0
+        self._measurements: OrderedDict[str, _MeasurementLatencies] = collections.OrderedDict()
+
+    def sent(self, measurement_id: str, chunk_order: Optional[int] = None, at: Optional[float] = None) -> int:
+        measurement = self._measurement(measurement_id)
+        if chunk_order is None:
+            chunk_order = measurement.next_chunk_order
+        chunk_order = int(chunk_order)
+        measurement.next_chunk_order = max(measurement.next_chunk_order, chunk_order + 1)
+        measurement.sent_at[chunk_order] = time.monotonic() if at is None else at
+        self.sent_count += 1
+        return chunk_order
+
+    def discard(self, measurement_id: str, chunk_order: Optional[int] = None) -> None:
+        measurement = self._measurements.get(measurement_id)
+        if measurement is not None and measurement.sent_at:
+            if chunk_order is None:
+                measurement.sent_at.popitem()
+            else:
+                measurement.sent_at.pop(int(chunk_order), None)
+
+    def received(self, measurement_id: str, result: Any = None, at: Optional[float] = None) -> Optional[float]:
+        measurement = self._measurements.get(measurement_id)
+        if measurement is None or not measurement.sent_at:
+            self.unmatched_count += 1
+            return None
+
+        # Results carry the ChunkOrder they belong to; without one, results arrive in the order chunks were sent
+        chunk_order = result.get("ChunkOrder") if isinstance(result, dict) else result
+        if chunk_order is None:
+            _, sent_at = measurement.sent_at.popitem(last=False)
+        else:
+            sent_at = measurement.sent_at.pop(int(chunk_order), None)
+            if sent_at is None:
+                self.unmatched_count += 1
+                return None
+
+        latency_s = (time.monotonic() if at is None else at) - sent_at
+        measurement.latencies_s.append(latency_s)
+        self.latencies_s.append(latency_s)
+        self.received_count += 1
+        return latency_s
+
+    def forget(self, measurement_id: str) -> None:
+        self._measurements.pop(measurement_id, None)
+
+    def pending(self, measurement_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        measurements = self._select(measurement_id)
+        return [{
+            "MeasurementID": mid,
+            "ChunkOrder": chunk_order,
+            "WaitingMs": round((now - sent_at) * 1000, 3)
+        } for mid, measurement in measurements for chunk_order, sent_at in measurement.sent_at.items()]
+
+    def stats(self, measurement_id: Optional[str] = None) -> Dict[str, Any]:
+        if measurement_id is None:
+            latencies_s: Iterable[float] = self.latencies_s
+        else:
+            measurement = self._measurements.get(measurement_id)
+            latencies_s = measurement.latencies_s if measurement is not None else ()
+        latencies_s = sorted(latencies_s)
+        return {
+            "Count": len(latencies_s),
+            "Pending": sum(len(m.sent_at) for _, m in self._select(measurement_id)),
+            "P50Ms": round(self.percentile(latencies_s, 50) * 1000, 3),
+            "P95Ms": round(self.percentile(latencies_s, 95) * 1000, 3),
+            "P99Ms": round(self.percentile(latencies_s, 99) * 1000, 3),
+            "MaxMs": round(latencies_s[-1] * 1000, 3) if latencies_s else 0.0,
+        }
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{"MeasurementID": mid, **self.stats(mid)} for mid in self._measurements]
+
+    @staticmethod
+    def percentile(sorted_values: List[float], p: float) -> float:
+        # Nearest-rank, so the result is always a latency that was actually observed
+        if not sorted_values:
+            return 0.0
+        rank = max(int(-(-p * len(sorted_values) // 100)), 1)
+        return sorted_values[rank - 1]
+
+    def _measurement(self, measurement_id: str) -> _MeasurementLatencies:
+        measurement = self._measurements.get(measurement_id)
+        if measurement is None:
+            measurement = self._measurements[measurement_id] = _MeasurementLatencies(self.window)
+            while len(self._measurements) > self.max_measurements:
+                self._measurements.popitem(last=False)
+        return measurement
+
+    def _select(self, measurement_id: Optional[str]) -> List[Any]:
+        if measurement_id is None:
+            return list(self._measurements.items())
+        measurement = self._measurements.get(measurement_id)
+        return [(measurement_id, measurement)] if measurement is not None else []
@@ -0,0 +1,56 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import json
+from typing import Any, Callable, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _to_bytes(data: Union[str, bytes, bytearray, memoryview]) -> Union[str, bytes, bytearray]:
+    return data.tobytes() if isinstance(data, memoryview) else data
+
+
+class Codec:
+    name = "json"
+    loads: Callable[[Union[str, bytes, bytearray, memoryview]], Any] = None
+    dumps: Callable[[Any], str] = None
+    dumps_bytes: Callable[[Any], bytes] = None
+
+    @classmethod
+    def available(cls) -> List[str]:
+        return [name for name, module in (("orjson", orjson), ("ujson", ujson), ("json", json)) if module is not None]
+
+    @classmethod
+    def use(cls, name: Optional[str] = None) -> None:
+        if name is None:
+            name = cls.available()[0]
+
+        if name == "orjson" and orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            cls.loads = staticmethod(orjson.loads)
+            cls.dumps = staticmethod(lambda obj: orjson.dumps(obj, option=option).decode('utf-8'))
+            cls.dumps_bytes = staticmethod(lambda obj: orjson.dumps(obj, option=option))
+        elif name == "ujson" and ujson is not None:
+            cls.loads = staticmethod(lambda data: ujson.loads(_to_bytes(data)))
+            cls.dumps = staticmethod(ujson.dumps)
+            cls.dumps_bytes = staticmethod(lambda obj: ujson.dumps(obj).encode('utf-8'))
+        elif name == "json":
+            cls.loads = staticmethod(lambda data: json.loads(_to_bytes(data)))
+            cls.dumps = staticmethod(json.dumps)
+            cls.dumps_bytes = staticmethod(lambda obj: json.dumps(obj).encode('utf-8'))
+        else:
+            raise ValueError(f"JSON codec '{name}' is not available, choose from {cls.available()}")
+
+        cls.name = name
+
+
+Codec.use()
@@ -14,6 +14,7 @@ class Devices(Base):
 
     @classmethod
     async def types(cls, session: aiohttp.ClientSession, **kwargs: Any) -> Any:
+        kwargs.setdefault("cache_as", cls.types.__qualname__)
         return await cls._get(session, f"{cls.url_fragment}/types", **kwargs)
 
     @classmethod
@@ -0,0 +1,146 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import functools
+import inspect
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from .Auths import Auths
+from .Codec import Codec
+from .Devices import Devices
+from .General import General
+from .Licenses import Licenses
+from .Measurements import Measurements
+from .Organizations import Organizations
+from .Profiles import Profiles
+from .RequestTracer import RequestTracer
+from .Studies import Studies
+from .TokenManager import TokenManager
+from .Users import Users
+from .WebSocketClient import WebSocketClient
+
+
+class BoundEndpoints:
+    def __init__(self, client: "DfxClient", endpoints: type):
+        self._client = client
+        self._endpoints = endpoints
+        self._takes_session: Dict[str, bool] = {}
+
+    def takes_session(self, name: str) -> bool:
+        takes_session = self._takes_session.get(name)
+        if takes_session is None:
+            try:
+                parameters = list(inspect.signature(getattr(self._endpoints, name)).parameters)
+            except (TypeError, ValueError):
+                parameters = []
+            takes_session = self._takes_session[name] = bool(parameters) and parameters[0] == "session"
+        return takes_session
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._endpoints, name)
+
+        # Everything that takes a session gets the client's long-lived one, `ws_*` helpers are passed through
+        if not self.takes_session(name):
+            return attr
+        kwargs = {"request_tracer": self._client.request_tracer} if self._client.request_tracer is not None else {}
+        if self._client.token_manager is not None:
+            return functools.partial(self._client.token_manager.call, attr, self._client.session, **kwargs)
+        return functools.partial(attr, self._client.session, **kwargs)
+
+
+class DfxClient:
+    def __init__(self,
+                 token: Optional[str] = None,
+                 headers: Optional[dict] = None,
+                 raise_for_status: bool = False,
+                 limit: int = 100,
+                 limit_per_host: int = 0,
+                 keepalive_timeout: float = 30.0,
+                 ttl_dns_cache: Optional[int] = 300,
+                 token_manager: Optional[TokenManager] = None,
+                 request_tracer: Optional[RequestTracer] = None,
+                 **session_kwargs: Any):
+        self._headers = dict(headers) if headers else {}
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        self._raise_for_status = raise_for_status
+        self._connector_kwargs = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "use_dns_cache": ttl_dns_cache is not None,
+            "ttl_dns_cache": ttl_dns_cache,
+        }
+        self._session_kwargs = session_kwargs
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.token_manager = token_manager
+        self.request_tracer = request_tracer
+
+        self.auths = BoundEndpoints(self, Auths)
+        self.devices = BoundEndpoints(self, Devices)
+        self.general = BoundEndpoints(self, General)
+        self.licenses = BoundEndpoints(self, Licenses)
+        self.measurements = BoundEndpoints(self, Measurements)
+        self.organizations = BoundEndpoints(self, Organizations)
+        self.profiles = BoundEndpoints(self, Profiles)
+        self.studies = BoundEndpoints(self, Studies)
+        self.users = BoundEndpoints(self, Users)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("DfxClient is not open, use `async with DfxClient() as client` or `await client.open()`")
+        return self._session
+
+    async def open(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+        session_kwargs = dict(self._session_kwargs)
+        if self.request_tracer is not None:
+            trace_configs = session_kwargs.get("trace_configs") or []
+            session_kwargs["trace_configs"] = [*trace_configs, self.request_tracer.trace_config()]
+        # A caller's own `connector` or `json_serialize` replaces the client's
+        if "connector" not in session_kwargs:
+            session_kwargs["connector"] = aiohttp.TCPConnector(**self._connector_kwargs)
+        session_kwargs.setdefault("json_serialize", Codec.dumps)
+        self._session = aiohttp.ClientSession(headers=self._headers,
+                                              raise_for_status=self._raise_for_status,
+                                              **session_kwargs)
+        if self.token_manager is not None:
+            await self.token_manager.start(self._session)
+
+    async def close(self) -> None:
+        if self.token_manager is not None:
+            await self.token_manager.stop()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "DfxClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def use_token_manager(self, token_manager: TokenManager) -> None:
+        self.token_manager = token_manager
+        if self._session is not None:
+            await token_manager.start(self._session)
+
+    def set_token(self, token: Optional[str]) -> None:
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        else:
+            self._headers.pop("Authorization", None)
+
+        if self._session is not None:
+            if token:
+                self._session.headers["Authorization"] = self._headers["Authorization"]
+            else:
+                self._session.headers.pop("Authorization", None)
+
+    async def websocket(self, **kwargs: Any) -> WebSocketClient:
+        return await WebSocketClient.connect(self.session, **kwargs)
@@ -15,14 +15,17 @@ class General(Base):
 
     @classmethod
     async def list_available_statuses(cls, session: aiohttp.ClientSession, **kwargs: Any) -> Any:
+        kwargs.setdefault("cache_as", cls.list_available_statuses.__qualname__)
         return await cls._get(session, "statuses", **kwargs)
 
     @classmethod
     async def list_available_user_roles(cls, session: aiohttp.ClientSession, **kwargs: Any) -> Any:
+        kwargs.setdefault("cache_as", cls.list_available_user_roles.__qualname__)
         return await cls._get(session, "roles", **kwargs)
 
     @classmethod
     async def list_accepted_mime_types(cls, session: aiohttp.ClientSession, **kwargs: Any) -> Any:
+        kwargs.setdefault("cache_as", cls.list_accepted_mime_types.__qualname__)
         return await cls._get(session, "mimes", **kwargs)
 
     @classmethod
@@ -31,4 +34,5 @@ class General(Base):
 
     @classmethod
     async def list_available_regions(cls, session: aiohttp.ClientSession, **kwargs: Any) -> Any:
+        kwargs.setdefault("cache_as", cls.list_available_regions.__qualname__)
         return await cls._get(session, "regions", **kwargs)
@@ -0,0 +1,97 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import codecs
+import json
+from typing import Any, AsyncIterator, Callable, Optional
+
+import aiohttp
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonArrayStream:
+    def __init__(self, resp: aiohttp.ClientResponse, chunk_size: int = 64 * 1024):
+        self.resp = resp
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.on_close: Optional[Callable[[], None]] = None
+        self._iterator: Optional[AsyncIterator[Any]] = None
+        self._closed = False
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+
+    async def to_list(self) -> list:
+        return [row async for row in self]
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            # Releasing a response that wasn't read to the end closes its connection instead of reusing it
+            self.resp.release()
+            if self.on_close is not None:
+                self.on_close()
+
+    async def __aenter__(self) -> "JsonArrayStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        # Only the current chunk and the row being parsed are held in memory, never the whole body
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+        try:
+            while True:
+                # Skip to the next row
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    char = buffer[pos]
+                    if not started:
+                        if char != "[":
+                            raise ValueError(f"JsonArrayStream error: Expecting a JSON array, got {char!r}")
+                        started = True
+                        pos += 1
+                        continue
+                    if char == "]":
+                        return
+                    if char == "," and self.rows:
+                        pos += 1
+                        continue
+
+                    # A row is complete once the character after it has arrived, e.g. `12` could still be `123`
+                    try:
+                        row, end = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        row, end = None, None
+                    if end is not None:
+                        after = end
+                        while after < len(buffer) and buffer[after] in _WHITESPACE:
+                            after += 1
+                        if after < len(buffer) or eof:
+                            pos = end
+                            self.rows += 1
+                            yield row
+                            continue
+
+                if eof:
+                    raise ValueError("JsonArrayStream error: Response ended before the JSON array did")
+
+                chunk = await self.resp.content.read(self.chunk_size)
+                if chunk:
+                    buffer = buffer[pos:] + utf8.decode(chunk)
+                else:
+                    buffer = buffer[pos:] + utf8.decode(b"", final=True)
+                    eof = True
+                pos = 0
+        finally:
+            self.close()
@@ -0,0 +1,590 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import base64
+import collections
+import hashlib
+import itertools
+import json
+import random
+import time
+import uuid
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+from aiohttp import web
+
+
+class LocalServer:
+    SIGNALS = {
+        "HR_BPM": ("Heart Rate", "bpm", "Heart rate measured from facial blood flow", "VITAL"),
+        "BP_SYSTOLIC": ("Systolic Blood Pressure", "mmHg", "Systolic blood pressure", "VITAL"),
+        "SNR": ("Signal to Noise Ratio", "dB", "Signal to noise ratio of the measurement", "GENERAL"),
+    }
+    STATUSES = [{"ID": "ACTIVE", "Name": "Active"}, {"ID": "INACTIVE", "Name": "Inactive"}]
+    ROLES = [{"ID": "ORG_ADMIN", "Name": "Organization Admin"}, {"ID": "DFX_LEAD", "Name": "Lead"}]
+    MIMES = [{"ID": "application/json", "Name": "JSON"}, {"ID": "application/octet-stream", "Name": "Binary"}]
+    REGIONS = [{"ID": "na-east", "Name": "North America"}, {"ID": "eu-central", "Name": "Europe"}]
+    STUDY_TYPES = [{"ID": "HEALTH", "Name": "Health"}]
+    DEVICE_TYPES = [{"ID": "LINUX", "Name": "Linux"}, {"ID": "IPHONE", "Name": "iPhone"}]
+
+    # Chunk fields sent as headers by `Measurements.add_data(body_type="octet-stream")`
+    CHUNK_HEADERS = {
+        "ChunkOrder": "X-Chunk-Order",
+        "Action": "X-Action",
+        "StartTime": "X-Start-Time",
+        "EndTime": "X-End-Time",
+        "Duration": "X-Duration",
+        "Meta": "X-Meta",
+    }
+
+    # Routes that work without a token, everything else is rejected with 401 when `require_auth` is set
+    OPEN_ROUTES = frozenset((
+        ("GET", "/status"),
+        ("POST", "/organizations/licenses"),
+        ("POST", "/organizations/auth"),
+        ("POST", "/users/auth"),
+        ("POST", "/auths/renew"),
+    ))
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency_s: float = 0.0,
+                 latency_jitter_s: float = 0.0,
+                 result_delay_s: float = 0.0,
+                 result_jitter_s: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_status: int = 500,
+                 ws_error_rate: float = 0.0,
+                 rate_limit_per_s: Optional[float] = None,
+                 require_auth: bool = False,
+                 token_ttl_s: float = 86400.0,
+                 number_studies: int = 3,
+                 sdk_config: bytes = b"\x00" * 1024,
+                 seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.latency_s = latency_s
+        self.latency_jitter_s = latency_jitter_s
+        self.result_delay_s = result_delay_s
+        self.result_jitter_s = result_jitter_s
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.ws_error_rate = ws_error_rate
+        self.rate_limit_per_s = rate_limit_per_s
+        self.require_auth = require_auth
+        self.token_ttl_s = token_ttl_s
+        self.sdk_config = sdk_config
+
+        self.stats: Dict[str, int] = collections.Counter()
+        self.measurements: Dict[str, dict] = {}
+        self.studies = {
+            f"study-{i}": {
+                "ID": f"study-{i}",
+                "Name": f"Study {i}",
+                "StatusID": "ACTIVE",
+                "Created": 0
+            }
+            for i in range(number_studies)
+        }
+        self.profiles: Dict[str, dict] = {}
+
+        self._random = random.Random(seed)
+        self._tokens: Dict[str, float] = {}
+        self._token_ids = itertools.count()
+        self._faults: Deque[Tuple[Optional[str], int, Optional[float]]] = collections.deque()
+        self._bucket = self._bucket_at = None
+        self._subscribers: Dict[str, List[Tuple[web.WebSocketResponse, str]]] = collections.defaultdict(list)
+        self._websockets: Set[web.WebSocketResponse] = set()
+        self._tasks: Set[asyncio.Future] = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application(middlewares=[self._middleware], client_max_size=1024**3)
+        app.router.add_get("/", self._ws_handler)
+        for method, path, handler in self._routes():
+            app.router.add_route(method, path, handler)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await self.disconnect_all()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "LocalServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    def fail_next(self, count: int = 1, status: int = 503, retry_after_s: Optional[float] = None,
+                  path: Optional[str] = None) -> None:
+        for _ in range(count):
+            self._faults.append((path, status, retry_after_s))
+
+    async def disconnect_all(self) -> None:
+        for ws in list(self._websockets):
+            await ws.close(code=aiohttp.WSCloseCode.GOING_AWAY)
+
+    def issue_token(self, subject: str = "local") -> str:
+        expires_at = time.time() + self.token_ttl_s
+        header = self._b64url({"alg": "none", "typ": "JWT"})
+        claims = self._b64url({"sub": subject, "exp": int(expires_at), "jti": next(self._token_ids)})
+        token = f"{header}.{claims}."
+        self._tokens[token] = expires_at
+        return token
+
+    def valid_token(self, token: Optional[str]) -> bool:
+        return token is not None and self._tokens.get(token, 0) > time.time()
+
+    # Faults, latency and auth for the REST routes
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        if request.path == "/":
+            return await handler(request)
+
+        self.stats["requests"] += 1
+        await self._delay()
+
+        fault = self._take_fault(request.path)
+        if fault is not None:
+            status, retry_after_s = fault
+            headers = {"Retry-After": f"{retry_after_s:g}"} if retry_after_s is not None else None
+            return self._error(status, "INJECTED_FAULT", headers)
+
+        retry_after_s = self._rate_limit()
+        if retry_after_s is not None:
+            self.stats["rate_limited"] += 1
+            return self._error(429, "RATE_LIMITED", {"Retry-After": f"{retry_after_s:.3g}"})
+
+        if self.require_auth and (request.method, request.path) not in self.OPEN_ROUTES:
+            authorization = request.headers.get("Authorization", "")
+            if not self.valid_token(authorization[len("Bearer "):] if authorization.startswith("Bearer ") else None):
+                return self._error(401, "INVALID_TOKEN")
+
+        return await handler(request)
+
+    async def _delay(self) -> None:
+        delay = self.latency_s + self._random.uniform(0, self.latency_jitter_s)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _take_fault(self, path: str) -> Optional[Tuple[int, Optional[float]]]:
+        for i, (fault_path, status, retry_after_s) in enumerate(self._faults):
+            if fault_path is None or path.endswith(fault_path):
+                del self._faults[i]
+                self.stats["faults"] += 1
+                return status, retry_after_s
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            self.stats["faults"] += 1
+            return self.error_status, None
+        return None
+
+    def _rate_limit(self) -> Optional[float]:
+        # Token bucket, one request per token and a burst of one second's worth
+        if not self.rate_limit_per_s:
+            return None
+        now = time.monotonic()
+        if self._bucket is None:
+            self._bucket, self._bucket_at = self.rate_limit_per_s, now
+        self._bucket = min(self.rate_limit_per_s, self._bucket + (now - self._bucket_at) * self.rate_limit_per_s)
+        self._bucket_at = now
+        if self._bucket >= 1:
+            self._bucket -= 1
+            return None
+        return (1 - self._bucket) / self.rate_limit_per_s
+
+    # REST routes
+
+    def _routes(self) -> List[Tuple[str, str, Any]]:
+        ok, created = self._ok, self._created
+        return [
+            ("GET", "/status", self._api_status),
+            ("GET", "/statuses", self._reference(self.STATUSES)),
+            ("GET", "/roles", self._reference(self.ROLES)),
+            ("GET", "/mimes", self._reference(self.MIMES)),
+            ("GET", "/regions", self._reference(self.REGIONS)),
+            ("GET", "/auth", ok),
+            ("PATCH", "/auths/users/reset", ok),
+            ("PATCH", "/auths/users/code", ok),
+            ("POST", "/auths/renew", self._renew),
+            ("POST", "/auths/generateToken", self._login),
+            ("GET", "/organizations", ok),
+            ("PATCH", "/organizations", ok),
+            ("GET", "/organizations/users", self._empty_list),
+            ("POST", "/organizations/users", created),
+            ("POST", "/organizations/licenses", self._register_license),
+            ("DELETE", "/organizations/licenses", ok),
+            ("POST", "/organizations/auth", self._login),
+            ("GET", "/organizations/measurements", self._list_measurements),
+            ("GET", "/organizations/measurements/{id}", self._retrieve_measurement),
+            ("GET", "/organizations/profiles", self._list_profiles),
+            ("GET", "/organizations/profiles/{id}", self._retrieve_profile),
+            ("PATCH", "/organizations/profiles/{id}", ok),
+            ("GET", "/organizations/users/{id}", ok),
+            ("PATCH", "/organizations/users/{id}", ok),
+            ("DELETE", "/organizations/users/{id}", ok),
+            ("GET", "/organizations/{id}/logo", self._logo),
+            ("DELETE", "/organizations/{id}/measurements", ok),
+            ("DELETE", "/organizations/{id}/partners/{partner_id}/measurements", ok),
+            ("GET", "/users", ok),
+            ("POST", "/users", created),
+            ("PATCH", "/users", ok),
+            ("DELETE", "/users", ok),
+            ("POST", "/users/auth", self._login),
+            ("DELETE", "/users/auth", ok),
+            ("POST", "/users/auth/code", self._login),
+            ("GET", "/users/auth/code/{org_key}/{phone_number}", ok),
+            ("POST", "/users/auth/renew", self._login),
+            ("POST", "/users/mfa/secret", ok),
+            ("POST", "/users/mfa", ok),
+            ("DELETE", "/users/mfa", ok),
+            ("GET", "/users/role", ok),
+            ("PATCH", "/users/sendreset", ok),
+            ("PATCH", "/users/reset", ok),
+            ("POST", "/users/verificationCode/{id}/{org_id}", ok),
+            ("POST", "/users/verify", ok),
+            ("POST", "/users/changepassword", ok),
+            ("POST", "/users/profiles", self._create_profile),
+            ("GET", "/users/profiles", self._list_profiles),
+            ("GET", "/users/profiles/{id}", self._retrieve_profile),
+            ("PATCH", "/users/profiles/{id}", ok),
+            ("DELETE", "/users/profiles/{id}", self._delete_profile),
+            ("GET", "/users/{id}/profiles", self._list_profiles),
+            ("DELETE", "/users/{id}/mfa", ok),
+            ("DELETE", "/users/{id}/measurements", ok),
+            ("GET", "/studies/types", self._reference(self.STUDY_TYPES)),
+            ("GET", "/studies/templates", self._empty_list),
+            ("POST", "/studies/sdkconfig", self._sdk_config),
+            ("GET", "/studies", self._list_studies),
+            ("POST", "/studies", created),
+            ("GET", "/studies/{id}", self._retrieve_study),
+            ("PATCH", "/studies/{id}", ok),
+            ("DELETE", "/studies/{id}", ok),
+            ("DELETE", "/studies/{id}/measurements", ok),
+            ("GET", "/devices/types", self._reference(self.DEVICE_TYPES)),
+            ("GET", "/devices/license", ok),
+            ("GET", "/devices", self._empty_list),
+            ("POST", "/devices", created),
+            ("GET", "/devices/{id}", ok),
+            ("PATCH", "/devices/{id}", ok),
+            ("DELETE", "/devices/{id}", ok),
+            ("DELETE", "/devices/{id}/measurements", ok),
+            ("GET", "/licenses/organization", self._empty_list),
+            ("GET", "/licenses/organization/{id}", ok),
+            ("POST", "/measurements", self._create_measurement),
+            ("GET", "/measurements", self._list_measurements),
+            ("GET", "/measurements/{id}", self._retrieve_measurement),
+            ("DELETE", "/measurements/{id}", self._delete_measurement),
+            ("POST", "/measurements/{id}/data", self._add_data),
+            ("GET", "/measurements/{id}/results/{chunk_order}", self._retrieve_intermediate),
+        ]
+
+    async def _ok(self, request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def _created(self, request: web.Request) -> web.Response:
+        return web.json_response({"ID": str(uuid.uuid4())})
+
+    async def _empty_list(self, request: web.Request) -> web.Response:
+        return web.json_response([])
+
+    async def _api_status(self, request: web.Request) -> web.Response:
+        return web.json_response({"StatusID": "ACTIVE", "Version": "local"})
+
+    def _reference(self, rows: List[dict]) -> Any:
+        body = json.dumps(rows).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+        async def handler(request: web.Request) -> web.Response:
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+        return handler
+
+    async def _logo(self, request: web.Request) -> web.Response:
+        return web.Response(body=b"\x89PNG\r\n\x1a\n", content_type="image/png")
+
+    async def _register_license(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "DeviceID": str(uuid.uuid4()),
+            "Token": self.issue_token("device"),
+            "RefreshToken": self.issue_token("device-refresh"),
+            "RoleID": "ANONYMOUS_DEVICE",
+            "UserID": "",
+        })
+
+    async def _login(self, request: web.Request) -> web.Response:
+        return web.json_response({"Token": self.issue_token("user"), "RefreshToken": self.issue_token("user-refresh")})
+
+    async def _renew(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if self.require_auth and body.get("RefreshToken") not in self._tokens:
+            return self._error(401, "INVALID_REFRESH_TOKEN")
+        self.stats["renewals"] += 1
+        return web.json_response({"Token": self.issue_token("renewed"), "RefreshToken": self.issue_token("refresh")})
+
+    async def _sdk_config(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        md5_hash = hashlib.md5(self.sdk_config).hexdigest()
+        if body.get("MD5Hash") == md5_hash:
+            return web.Response(status=304)
+        return web.json_response({"ConfigFile": base64.b64encode(self.sdk_config).decode(), "MD5Hash": md5_hash})
+
+    async def _list_studies(self, request: web.Request) -> web.Response:
+        return web.json_response(self._page(request, list(self.studies.values())))
+
+    async def _retrieve_study(self, request: web.Request) -> web.Response:
+        study = self.studies.get(request.match_info["id"])
+        return web.json_response(study) if study is not None else self._error(404, "NOT_FOUND")
+
+    async def _create_profile(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        profile_id = str(uuid.uuid4())
+        self.profiles[profile_id] = {"ID": profile_id, "Name": body.get("Name"), "Email": body.get("Email")}
+        return web.json_response({"ID": profile_id})
+
+    async def _list_profiles(self, request: web.Request) -> web.Response:
+        return web.json_response(self._page(request, list(self.profiles.values())))
+
+    async def _retrieve_profile(self, request: web.Request) -> web.Response:
+        profile = self.profiles.get(request.match_info["id"])
+        return web.json_response(profile) if profile is not None else self._error(404, "NOT_FOUND")
+
+    async def _delete_profile(self, request: web.Request) -> web.Response:
+        self.profiles.pop(request.match_info["id"], None)
+        return web.json_response({})
+
+    # Measurements and results
+
+    async def _create_measurement(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        measurement_id = str(uuid.uuid4())
+        self.measurements[measurement_id] = {
+            "ID": measurement_id,
+            "StudyID": body.get("StudyID"),
+            "UserProfileID": body.get("UserProfileID"),
+            "PartnerID": body.get("PartnerID"),
+            "StatusID": "CREATED",
+            "Created": int(time.time()),
+            "Chunks": {},
+            "Results": {},
+        }
+        self.stats["measurements"] += 1
+        return web.json_response({"ID": measurement_id})
+
+    async def _list_measurements(self, request: web.Request) -> web.Response:
+        rows = [self._measurement_row(m) for m in reversed(list(self.measurements.values()))]
+        return web.json_response(self._page(request, rows))
+
+    async def _retrieve_measurement(self, request: web.Request) -> web.Response:
+        measurement = self.measurements.get(request.match_info["id"])
+        if measurement is None:
+            return self._error(404, "NOT_FOUND")
+        return web.json_response(self._measurement_results(measurement))
+
+    async def _delete_measurement(self, request: web.Request) -> web.Response:
+        self.measurements.pop(request.match_info["id"], None)
+        return web.json_response({})
+
+    async def _add_data(self, request: web.Request) -> web.Response:
+        measurement = self.measurements.get(request.match_info["id"])
+        if measurement is None:
+            return self._error(404, "NOT_FOUND")
+        # JSON with a base64 payload, a raw payload with the chunk in `X-` headers, or a JSON part and a payload part
+        if request.content_type == "application/octet-stream":
+            body = {k: request.headers[header] for k, header in self.CHUNK_HEADERS.items() if header in request.headers}
+            size = len(await request.read())
+        elif request.content_type == "multipart/form-data":
+            body, size = {}, 0
+            async for part in await request.multipart():
+                if part.name == "Chunk":
+                    body = await part.json()
+                else:
+                    size = len(await part.read())
+        else:
+            body = await request.json()
+            size = len(base64.b64decode(body.get("Payload", "")))
+        chunk_order = self._receive_chunk(measurement, body.get("Action"), body.get("ChunkOrder"), size)
+        return web.json_response({"ID": measurement["ID"], "ChunkOrder": chunk_order})
+
+    async def _retrieve_intermediate(self, request: web.Request) -> web.Response:
+        measurement = self.measurements.get(request.match_info["id"])
+        if measurement is None:
+            return self._error(404, "NOT_FOUND")
+        # Like the API, a result that isn't ready yet is an empty object
+        result = measurement["Results"].get(int(request.match_info["chunk_order"]))
+        return web.json_response(result if result is not None else {})
+
+    def _receive_chunk(self, measurement: dict, action: str, chunk_order: Optional[int], size: int) -> int:
+        if chunk_order is None:
+            chunk_order = len(measurement["Chunks"])
+        chunk_order = int(chunk_order)
+        measurement["Chunks"][chunk_order] = {"Action": action, "Size": size}
+        measurement["StatusID"] = "PROCESSING"
+        self.stats["chunks"] += 1
+        self.stats["bytes"] += size
+
+        delay = self.result_delay_s + self._random.uniform(0, self.result_jitter_s)
+        task = asyncio.ensure_future(self._produce_result(measurement, chunk_order, action, delay))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return chunk_order
+
+    async def _produce_result(self, measurement: dict, chunk_order: int, action: str, delay: float) -> None:
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        result = {
+            "ID": measurement["ID"],
+            "ChunkOrder": chunk_order,
+            "Results": {
+                signal_id: [{
+                    "Data": [self._random.randint(50000, 90000) for _ in range(5)],
+                    "Multiplier": 1000
+                }]
+                for signal_id in self.SIGNALS
+            },
+        }
+        measurement["Results"][chunk_order] = result
+        if action and action.startswith("LAST"):
+            measurement["StatusID"] = "COMPLETE"
+        self.stats["results"] += 1
+
+        frame = json.dumps(result).encode()
+        for ws, request_id in list(self._subscribers.get(measurement["ID"], ())):
+            if not ws.closed:
+                await ws.send_bytes(self._frame(request_id, 200, frame))
+
+    def _measurement_row(self, measurement: dict) -> dict:
+        return {k: v for k, v in measurement.items() if k not in ("Chunks", "Results")}
+
+    def _measurement_results(self, measurement: dict) -> dict:
+        body = self._measurement_row(measurement)
+        if measurement["Results"]:
+            ordered = [measurement["Results"][k] for k in sorted(measurement["Results"])]
+            body["Results"] = {
+                signal_id: [{
+                    "Data": [d for result in ordered for d in result["Results"][signal_id][0]["Data"]],
+                    "Multiplier": 1000
+                }]
+                for signal_id in self.SIGNALS
+            }
+            body["SignalNames"] = {k: v[0] for k, v in self.SIGNALS.items()}
+            body["SignalUnits"] = {k: v[1] for k, v in self.SIGNALS.items()}
+            body["SignalDescriptions"] = {k: v[2] for k, v in self.SIGNALS.items()}
+            body["SignalConfig"] = {k: {"category": v[3]} for k, v in self.SIGNALS.items()}
+        return body
+
+    # WebSocket
+
+    async def _ws_handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(protocols=["json"], max_msg_size=0)
+        await ws.prepare(request)
+        self._websockets.add(ws)
+        self.stats["ws_connections"] += 1
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    data = msg.data.encode()
+                elif msg.type == aiohttp.WSMsgType.BINARY:
+                    data = msg.data
+                else:
+                    continue
+                self.stats["ws_frames"] += 1
+                # Handle each request on its own so latency overlaps like it does on a real server
+                task = asyncio.ensure_future(self._ws_request(ws, data, msg.type == aiohttp.WSMsgType.BINARY))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            self._websockets.discard(ws)
+            for subscribers in self._subscribers.values():
+                subscribers[:] = [s for s in subscribers if s[0] is not ws]
+        return ws
+
+    async def _ws_request(self, ws: web.WebSocketResponse, data: bytes, binary: bool) -> None:
+        action_id, request_id = data[:4].decode(), data[4:14].decode().strip()
+        await self._delay()
+        try:
+            status, response = self._ws_dispatch(ws, action_id, request_id, data, binary)
+        except (KeyError, TypeError, ValueError):
+            status, response = 400, {"Code": "INVALID_REQUEST"}
+        if not ws.closed:
+            await ws.send_bytes(self._frame(request_id, status, json.dumps(response).encode()))
+
+    def _ws_dispatch(self, ws: web.WebSocketResponse, action_id: str, request_id: str, data: bytes,
+                     binary: bool) -> Tuple[int, dict]:
+        if action_id == "0718":
+            request = json.loads(data[14:])
+            if self.require_auth and not self.valid_token(request.get("Token")):
+                return 401, {"Code": "INVALID_TOKEN"}
+            return 200, {}
+
+        if action_id == "0510":
+            request = json.loads(data[14:])
+            if request["Params"]["ID"] not in self.measurements:
+                return 404, {"Code": "NOT_FOUND"}
+            self._subscribers[request["Params"]["ID"]].append((ws, request["RequestID"]))
+            return 200, {}
+
+        if action_id == "0506":
+            if binary:
+                # The JSON envelope is ASCII, latin-1 maps every byte to one char so the decoder finds its end
+                request, end = json.JSONDecoder().raw_decode(data[14:].decode("latin-1"))
+                size = len(data) - 14 - end
+                if size != request["PayloadLength"]:
+                    return 400, {"Code": "INVALID_PAYLOAD_LENGTH"}
+            else:
+                request = json.loads(data[14:])
+                size = len(base64.b64decode(request["Payload"]))
+
+            measurement = self.measurements.get(request["Params"]["ID"])
+            if measurement is None:
+                return 404, {"Code": "NOT_FOUND"}
+            if self.ws_error_rate > 0 and self._random.random() < self.ws_error_rate:
+                self.stats["faults"] += 1
+                return 500, {"Code": "INJECTED_FAULT"}
+            chunk_order = self._receive_chunk(measurement, request["Action"], request.get("ChunkOrder"), size)
+            return 200, {"ID": measurement["ID"], "ChunkOrder": chunk_order}
+
+        return 404, {"Code": "UNKNOWN_ACTION"}
+
+    # Helpers
+
+    def _page(self, request: web.Request, rows: List[dict]) -> List[dict]:
+        limit = int(request.query.get("Limit") or 50)
+        offset = int(request.query.get("Offset") or 0)
+        return rows[offset:offset + limit]
+
+    @staticmethod
+    def _frame(request_id: str, status: int, payload: bytes) -> bytes:
+        return f"{request_id:10}{status:03d}".encode() + payload
+
+    @staticmethod
+    def _error(status: int, code: str, headers: Optional[dict] = None) -> web.Response:
+        return web.json_response({"Code": code, "Errors": [code]}, status=status, headers=headers)
+
+    @staticmethod
+    def _b64url(claims: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
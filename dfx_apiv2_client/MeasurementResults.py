@@ -0,0 +1,129 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import math
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_RESULT_KEYS = ("Results", "SignalNames", "SignalUnits", "SignalDescriptions", "SignalConfig")
+
+
+class SignalResult:
+    __slots__ = ("id", "name", "unit", "category", "description", "values")
+
+    def __init__(self, id: str, name: str, unit: str, category: str, description: str, values: array):
+        self.id = id
+        self.name = name
+        self.unit = unit
+        self.category = category
+        self.description = description
+        self.values = values  # array('d') with the Multiplier already applied
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def numpy(self) -> Any:
+        # A view onto `values`, nothing is copied
+        if numpy is None:
+            raise ImportError("SignalResult.numpy() requires numpy")
+        return numpy.frombuffer(self.values, dtype=numpy.float64)
+
+    @property
+    def mean(self) -> float:
+        if not self.values:
+            return math.nan
+        if numpy is not None:
+            return float(self.numpy().mean())
+        return math.fsum(self.values) / len(self.values)
+
+    @property
+    def min(self) -> float:
+        return min(self.values) if self.values else math.nan
+
+    @property
+    def max(self) -> float:
+        return max(self.values) if self.values else math.nan
+
+    @property
+    def std(self) -> float:
+        if not self.values:
+            return math.nan
+        if numpy is not None:
+            return float(self.numpy().std())
+        mean = self.mean
+        return math.sqrt(math.fsum((v - mean)**2 for v in self.values) / len(self.values))
+
+
+class MeasurementResults:
+    __slots__ = ("id", "properties", "signals", "_by_id", "_by_name", "_by_category")
+
+    def __init__(self, properties: Dict[str, Any], signals: List[SignalResult]):
+        self.id: Optional[str] = properties.get("ID")
+        self.properties = properties  # Everything in the measurement other than its results
+        self.signals = signals
+        self._by_id = {signal.id: signal for signal in signals}
+        self._by_name = {signal.name: signal for signal in signals}
+        self._by_category: Dict[str, Tuple[SignalResult, ...]] = {}
+        for signal in signals:
+            self._by_category[signal.category] = self._by_category.get(signal.category, ()) + (signal, )
+
+    @classmethod
+    def parse(cls, measurement: Mapping[str, Any]) -> "MeasurementResults":
+        # Parses the body of `Measurements.retrieve(expand=True)`
+        properties = {k: v for k, v in measurement.items() if k not in _RESULT_KEYS}
+        results = measurement.get("Results") or {}
+        units = measurement.get("SignalUnits") or {}
+        descriptions = measurement.get("SignalDescriptions") or {}
+        config = measurement.get("SignalConfig") or {}
+
+        signals = []
+        for signal_id, name in (measurement.get("SignalNames") or {}).items():
+            result = results[signal_id][0]
+            # The same names, units and categories repeat in every measurement, so share one copy of each
+            signals.append(
+                SignalResult(sys.intern(signal_id), sys.intern(name), sys.intern(units.get(signal_id) or ""),
+                             sys.intern((config.get(signal_id) or {}).get("category") or ""),
+                             sys.intern(descriptions.get(signal_id) or ""),
+                             cls._values(result["Data"], result.get("Multiplier") or 1)))
+        return cls(properties, signals)
+
+    def __getitem__(self, signal_id: str) -> SignalResult:
+        return self._by_id[signal_id]
+
+    def __contains__(self, signal_id: str) -> bool:
+        return signal_id in self._by_id
+
+    def __iter__(self) -> Iterator[SignalResult]:
+        return iter(self.signals)
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    def get(self, signal_id: str) -> Optional[SignalResult]:
+        return self._by_id.get(signal_id)
+
+    def by_name(self, name: str) -> Optional[SignalResult]:
+        return self._by_name.get(name)
+
+    def by_category(self, category: str) -> Tuple[SignalResult, ...]:
+        return self._by_category.get(category, ())
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._by_category)
+
+    @staticmethod
+    def _values(data: List[float], multiplier: float) -> array:
+        if numpy is not None:
+            values = array("d")
+            values.frombytes((numpy.asarray(data, dtype=numpy.float64) / multiplier).tobytes())
+            return values
+        if multiplier == 1:
+            return array("d", data)
+        return array("d", [d / multiplier for d in data])
@@ -2,17 +2,26 @@
 # See LICENSE.txt in the project root for license information
 
 import base64
-import json
 import warnings
 from typing import Any, Union, Optional
 
 import aiohttp
 
 from .Base import Base
+from .Codec import Codec
 
 
 class Measurements(Base):
     url_fragment = "measurements"
+    ws_add_data_action_id = "0506"
+    add_data_headers = {
+        "ChunkOrder": "X-Chunk-Order",
+        "Action": "X-Action",
+        "StartTime": "X-Start-Time",
+        "EndTime": "X-End-Time",
+        "Duration": "X-Duration",
+        "Meta": "X-Meta",
+    }
 
     @classmethod
     async def create(cls,
@@ -43,14 +52,34 @@ class Measurements(Base):
                        end_time_s: Optional[str] = None,
                        duration_s: Optional[str] = None,
                        metadata: Optional[Union[bytes, bytearray, memoryview]] = None,
+                       body_type: str = "json",
                        **kwargs: Any) -> Any:
-        data = {
-            "Action": action,
-            "Payload": base64.standard_b64encode(payload).decode('ascii'),
-        }
-        data = {k: v for k, v in data.items() if v is not None}
+        url_fragment = f"{cls.url_fragment}/{measurement_id}/data"
+        request = cls._add_data_request(action, chunk_order, start_time_s, end_time_s, duration_s, metadata)
 
-        return await cls._post(session, f"{cls.url_fragment}/{measurement_id}/data", data=data, **kwargs)
+        if body_type == "json":
+            request["Payload"] = base64.standard_b64encode(payload).decode('ascii')
+            return await cls._post(session, url_fragment, data=request, **kwargs)
+
+        # The raw payload is sent as is, aiohttp writes the memoryview to the socket without copying it
+        payload_view = cls._payload_view(payload)
+        if body_type == "octet-stream":
+            # Chunk metadata travels in headers, e.g. `X-Chunk-Order`
+            headers = {cls.add_data_headers[k]: str(v) for k, v in request.items()}
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **headers}
+            data = aiohttp.BytesPayload(payload_view, content_type="application/octet-stream")
+        elif body_type == "multipart":
+            # Chunk metadata travels in a small JSON part ahead of the payload part
+            data = aiohttp.MultipartWriter("form-data")
+            part = data.append_payload(cls._json_payload(request))
+            part.set_content_disposition("form-data", name="Chunk")
+            part = data.append_payload(aiohttp.BytesPayload(payload_view, content_type="application/octet-stream"))
+            part.set_content_disposition("form-data", name="Payload", filename="payload")
+        else:
+            raise ValueError(f"Measurements.add_data body_type must be json, octet-stream or multipart, "
+                             f"not {body_type!r}")
+
+        return await cls._request(session, "POST", url_fragment, data=data, **kwargs)
 
     @classmethod
     async def list(cls,
@@ -104,7 +133,7 @@ class Measurements(Base):
             "RequestID": str(results_request_id),
         }
 
-        ws_request = f"{action_id:4}{request_id:10}{json.dumps(request)}"
+        ws_request = f"{action_id:4}{request_id:10}{Codec.dumps(request)}"
 
         await ws.send_str(ws_request)
 
@@ -122,26 +151,117 @@ class Measurements(Base):
         end_time_s: Optional[str] = None,
         duration_s: Optional[str] = None,
         metadata: Optional[Union[bytes, bytearray, memoryview]] = None,
+        binary: bool = False,
     ) -> None:
-        action_id = "0506"
+        if binary:
+            ws_request = cls.ws_encode_add_data_binary(request_id,
+                                                       measurement_id,
+                                                       action,
+                                                       payload,
+                                                       chunk_order=chunk_order,
+                                                       start_time_s=start_time_s,
+                                                       end_time_s=end_time_s,
+                                                       duration_s=duration_s,
+                                                       metadata=metadata)
+            await ws.send_bytes(ws_request)
+        else:
+            ws_request = cls.ws_encode_add_data(request_id,
+                                                measurement_id,
+                                                action,
+                                                payload,
+                                                chunk_order=chunk_order,
+                                                start_time_s=start_time_s,
+                                                end_time_s=end_time_s,
+                                                duration_s=duration_s,
+                                                metadata=metadata)
+            await ws.send_str(ws_request)
 
-        request = {
+    @classmethod
+    def ws_encode_add_data(
+        cls,
+        request_id: str,
+        measurement_id: str,
+        action: str,
+        payload: Union[bytes, bytearray, memoryview],
+        *,
+        chunk_order: Optional[Union[str, int]] = None,
+        start_time_s: Optional[str] = None,
+        end_time_s: Optional[str] = None,
+        duration_s: Optional[str] = None,
+        metadata: Optional[Union[bytes, bytearray, memoryview]] = None,
+    ) -> str:
+        request = cls._ws_add_data_request(measurement_id, action, chunk_order, start_time_s, end_time_s, duration_s,
+                                           metadata)
+        request["Payload"] = base64.standard_b64encode(payload).decode('ascii')
+
+        return f"{cls.ws_add_data_action_id:4}{request_id:10}{Codec.dumps(request)}"
+
+    @classmethod
+    def ws_encode_add_data_binary(
+        cls,
+        request_id: str,
+        measurement_id: str,
+        action: str,
+        payload: Union[bytes, bytearray, memoryview],
+        *,
+        chunk_order: Optional[Union[str, int]] = None,
+        start_time_s: Optional[str] = None,
+        end_time_s: Optional[str] = None,
+        duration_s: Optional[str] = None,
+        metadata: Optional[Union[bytes, bytearray, memoryview]] = None,
+    ) -> bytearray:
+        # Binary frame layout: 4-char action ID, 10-char request ID, JSON envelope, raw payload.
+        # The envelope carries `PayloadLength` so the payload can be split off the end of the frame.
+        payload_view = cls._payload_view(payload)
+        payload_length = payload_view.nbytes
+
+        request = cls._ws_add_data_request(measurement_id, action, chunk_order, start_time_s, end_time_s, duration_s,
+                                           metadata)
+        request["PayloadLength"] = payload_length
+
+        header = f"{cls.ws_add_data_action_id:4}{request_id:10}".encode('ascii')
+        envelope = Codec.dumps_bytes(request)
+
+        envelope_end = len(header) + len(envelope)
+        frame = bytearray(envelope_end + payload_length)
+        with memoryview(frame) as frame_view:  # Slice-assigning through a memoryview avoids temporary copies
+            frame_view[:len(header)] = header
+            frame_view[len(header):envelope_end] = envelope
+            frame_view[envelope_end:] = payload_view
+
+        return frame
+
+    @classmethod
+    def _ws_add_data_request(cls, measurement_id: str, action: str, chunk_order: Optional[Union[str, int]],
+                             start_time_s: Optional[str], end_time_s: Optional[str], duration_s: Optional[str],
+                             metadata: Optional[Union[bytes, bytearray, memoryview]]) -> dict:
+        return {
             "Params": {
                 "ID": measurement_id,
             },
+            **cls._add_data_request(action, chunk_order, start_time_s, end_time_s, duration_s, metadata)
+        }
+
+    @classmethod
+    def _add_data_request(cls, action: str, chunk_order: Optional[Union[str, int]], start_time_s: Optional[str],
+                          end_time_s: Optional[str], duration_s: Optional[str],
+                          metadata: Optional[Union[bytes, bytearray, memoryview]]) -> dict:
+        request = {
             "ChunkOrder": int(chunk_order) if chunk_order is not None else None,
             "Action": action,
             "StartTime": start_time_s,
             "EndTime": end_time_s,
             "Duration": int(duration_s) if duration_s is not None else None,
             "Meta": base64.standard_b64encode(metadata).decode('ascii') if metadata else None,
-            "Payload": base64.standard_b64encode(payload).decode('ascii'),
         }
-        request = {k: v for k, v in request.items() if v is not None}
+        return {k: v for k, v in request.items() if v is not None}
 
-        ws_request = f"{action_id:4}{request_id:10}{json.dumps(request)}"
-
-        await ws.send_str(ws_request)
+    @staticmethod
+    def _payload_view(payload: Union[bytes, bytearray, memoryview]) -> memoryview:
+        payload_view = memoryview(payload)
+        if payload_view.format != 'B' or payload_view.ndim != 1:
+            payload_view = payload_view.cast('B')
+        return payload_view
 
     @classmethod
     async def delete(cls, session: aiohttp.ClientSession, measurement_id: str, **kwargs: Any) -> Any:
@@ -2,13 +2,13 @@
 # See LICENSE.txt in the project root for license information
 
 import base64
-import json
 import warnings
 from typing import Any, Union
 
 import aiohttp
 
 from .Base import Base
+from .Codec import Codec
 from .Settings import Settings
 
 
@@ -288,7 +288,7 @@ class Organizations(Base):
             "Token":  Settings.user_token if Settings.user_token else Settings.device_token,
         }
 
-        ws_request = f"{action_id:4}{request_id:10}{json.dumps(request)}"
+        ws_request = f"{action_id:4}{request_id:10}{Codec.dumps(request)}"
 
         await ws.send_str(ws_request)
 
@@ -0,0 +1,95 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import collections
+import inspect
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, List, Optional
+
+
+class Paginator:
+    def __init__(self,
+                 list_method: Callable[..., Awaitable[Any]],
+                 *args: Any,
+                 page_size: Optional[int] = None,
+                 concurrency: int = 4,
+                 max_items: Optional[int] = None,
+                 stop_when: Optional[Callable[[Any], bool]] = None,
+                 offset: int = 0,
+                 rows_key: Optional[str] = None,
+                 **kwargs: Any):
+        if concurrency < 1:
+            raise ValueError("Paginator concurrency must be at least 1")
+        self._list_method = list_method
+        self._args = args
+        self._kwargs = kwargs
+        self._page_size = page_size if page_size is not None else self._default_page_size(list_method)
+        self._concurrency = concurrency
+        self._max_items = max_items
+        self._stop_when = stop_when
+        self._offset = offset
+        self._rows_key = rows_key
+        self.pages_fetched = 0
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def to_list(self) -> List[Any]:
+        return [row async for row in self]
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        end = self._offset + self._max_items if self._max_items is not None else None
+        next_offset = self._offset
+        pending: Deque[asyncio.Task] = collections.deque()
+        yielded = 0
+
+        def schedule() -> None:
+            nonlocal next_offset
+            while len(pending) < self._concurrency and (end is None or next_offset < end):
+                pending.append(asyncio.ensure_future(self._fetch(next_offset)))
+                next_offset += self._page_size
+
+        try:
+            if self._max_items is not None and self._max_items <= 0:
+                return
+            schedule()
+            while pending:
+                rows = await pending.popleft()
+                for row in rows:
+                    if self._stop_when is not None and self._stop_when(row):
+                        return
+                    yield row
+                    yielded += 1
+                    if self._max_items is not None and yielded >= self._max_items:
+                        return
+
+                # A short page is the last one, pages prefetched past it are discarded
+                if len(rows) < self._page_size:
+                    return
+                schedule()
+        finally:
+            # Prefetched pages are awaited too, so none outlives the iterator or leaves its exception unretrieved
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _fetch(self, offset: int) -> List[Any]:
+        status, body = await self._list_method(*self._args, limit=self._page_size, offset=offset, **self._kwargs)
+        if status >= 400:
+            raise ValueError(f"Paginator error: API Status {status} for offset {offset}, response: {body}")
+        self.pages_fetched += 1
+
+        rows = body[self._rows_key] if self._rows_key is not None else body
+        if not isinstance(rows, list):
+            raise ValueError(f"Paginator error: Expecting a list response for offset {offset}, got {type(rows)}")
+        return rows
+
+    @staticmethod
+    def _default_page_size(list_method: Callable[..., Awaitable[Any]]) -> int:
+        try:
+            limit = inspect.signature(list_method).parameters.get("limit")
+        except (TypeError, ValueError):
+            limit = None
+        if limit is None or not isinstance(limit.default, int):
+            return 50
+        return limit.default
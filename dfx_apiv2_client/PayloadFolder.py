@@ -0,0 +1,152 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import collections
+import concurrent.futures
+import glob
+import json
+import mmap
+import os.path
+import threading
+from typing import AsyncIterator, Deque, Optional, Set, Union
+
+
+class PayloadChunk:
+    __slots__ = ("chunk_order", "number_chunks", "action", "duration_s", "start_time_s", "end_time_s", "payload",
+                 "_mmap")
+
+    def __init__(self, chunk_order: int, number_chunks: int, action: str, duration_s: float,
+                 start_time_s: Optional[float], end_time_s: Optional[float], payload: Union[bytes, memoryview]):
+        self.chunk_order = chunk_order
+        self.number_chunks = number_chunks
+        self.action = action
+        self.duration_s = duration_s
+        self.start_time_s = start_time_s
+        self.end_time_s = end_time_s
+        self.payload = payload
+        self._mmap: Optional[mmap.mmap] = None
+
+    def release(self) -> None:
+        if self._mmap is not None:
+            self.payload.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+class PayloadFolder:
+    def __init__(self, folder: str, chunk_duration_s: float = 5.0, use_mmap: bool = False):
+        self.folder = folder
+        self.use_mmap = use_mmap
+        self.payload_files = sorted(glob.glob(os.path.join(folder, "payload*.bin")))
+        self.prop_files = sorted(glob.glob(os.path.join(folder, "properties*.json")))
+        self.found_props = len(self.prop_files) > 0
+        self.number_chunks = len(self.payload_files)
+        self.duration_s = chunk_duration_s
+
+    @staticmethod
+    def determine_action(chunk_number: int, number_chunks: int) -> str:
+        action = 'CHUNK::PROCESS'
+        if chunk_number == 0 and number_chunks > 1:
+            action = 'FIRST::PROCESS'
+        elif chunk_number == number_chunks - 1:
+            action = 'LAST::PROCESS'
+        return action
+
+    def validate(self, max_total_duration_s: float = 120) -> None:
+        number_files = len(self.payload_files)
+        if self.found_props:
+            number_files = min(number_files, len(self.prop_files))
+        if number_files <= 0:
+            raise ValueError(f"No payload files found in {self.folder}")
+
+        if self.found_props:
+            props = self._read_props(0)
+            self.number_chunks = props["number_chunks"]
+            self.duration_s = props["duration_s"]
+            if self.number_chunks != number_files:
+                raise ValueError(f"Number of chunks in properties.json {self.number_chunks} != "
+                                 f"Number of payload files {number_files}")
+            if self.duration_s * self.number_chunks > max_total_duration_s:
+                raise ValueError(f"Total payload duration {self.duration_s * self.number_chunks} seconds is more "
+                                 f"than {max_total_duration_s} seconds")
+        else:
+            self.number_chunks = number_files
+
+    def read_chunk(self, index: int) -> PayloadChunk:
+        start_time_s = end_time_s = None
+        duration_s = self.duration_s
+        number_chunks = self.number_chunks
+        chunk_number = index
+        if self.found_props:
+            props = self._read_props(index)
+            duration_s = props["duration_s"]
+            number_chunks = props["number_chunks"]
+            chunk_number = props["chunk_number"]
+            start_time_s = props.get("start_time_s")
+            end_time_s = props.get("end_time_s")
+
+        with open(self.payload_files[index], 'rb') as p:
+            # An empty file can't be mapped
+            if self.use_mmap and os.fstat(p.fileno()).st_size > 0:
+                payload_mmap = mmap.mmap(p.fileno(), 0, access=mmap.ACCESS_READ)
+                payload = memoryview(payload_mmap)
+            else:
+                payload_mmap = None
+                payload = p.read()
+
+        chunk = PayloadChunk(chunk_number, number_chunks, self.determine_action(chunk_number, number_chunks),
+                             duration_s, start_time_s, end_time_s, payload)
+        chunk._mmap = payload_mmap
+        return chunk
+
+    async def chunks(self,
+                     prefetch: int = 1,
+                     executor: Optional[concurrent.futures.Executor] = None) -> AsyncIterator[PayloadChunk]:
+        loop = asyncio.get_running_loop()
+        pending: Deque[asyncio.Future] = collections.deque()
+        next_index = 0
+        # Chunks read ahead but not yet handed out, released if the generator is closed before they are
+        unclaimed: Set[PayloadChunk] = set()
+        lock = threading.Lock()
+        closed = False
+
+        def load(index: int) -> PayloadChunk:
+            chunk = self.read_chunk(index)
+            with lock:
+                if closed:
+                    chunk.release()
+                else:
+                    unclaimed.add(chunk)
+            return chunk
+
+        def schedule() -> None:
+            nonlocal next_index
+            while len(pending) < max(prefetch, 1) and next_index < self.number_chunks:
+                pending.append(loop.run_in_executor(executor, load, next_index))
+                next_index += 1
+
+        try:
+            schedule()
+            while pending:
+                chunk = await pending.popleft()
+                with lock:
+                    unclaimed.discard(chunk)
+                # Start reading the next chunk(s) off the event loop while this one is being sent
+                schedule()
+                yield chunk
+        finally:
+            with lock:
+                closed = True
+                for chunk in unclaimed:
+                    chunk.release()
+                unclaimed.clear()
+            for future in pending:
+                future.cancel()
+
+    def _read_props(self, index: int) -> dict:
+        with open(self.prop_files[index], 'r') as pr:
+            props = json.load(pr)
+        if "duration_s" not in props:
+            props["duration_s"] = props["end_time_s"] - props["start_time_s"]
+        return props
@@ -0,0 +1,169 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import bisect
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+
+class RequestTiming:
+    __slots__ = ("endpoint", "method", "attempt", "status", "error", "reused_connection", "start", "queued_s", "dns_s",
+                 "connect_s", "sent_at", "response_at", "server_s", "read_s", "total_s", "_phase_start")
+
+    PHASES = ("queued_s", "dns_s", "connect_s", "server_s", "read_s", "total_s")
+
+    def __init__(self, endpoint: str, method: str, attempt: int = 0):
+        self.endpoint = endpoint
+        self.method = method
+        self.attempt = attempt
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.reused_connection = False
+        self.start = time.perf_counter()
+        self.queued_s: Optional[float] = None
+        self.dns_s: Optional[float] = None
+        self.connect_s: Optional[float] = None  # TCP connect and TLS handshake
+        self.sent_at: Optional[float] = None
+        self.response_at: Optional[float] = None
+        self.server_s: Optional[float] = None  # Request sent until response headers received
+        self.read_s: Optional[float] = None  # Response body read and decoded
+        self.total_s: Optional[float] = None
+        self._phase_start = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith("_")}
+
+
+class LatencyHistogram:
+    BOUNDS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, bounds_s: Sequence[float] = BOUNDS_S):
+        self.bounds_s = tuple(bounds_s)
+        self.counts = [0] * (len(self.bounds_s) + 1)
+        self.count = 0
+        self.sum_s = 0.0
+        self.max_s = 0.0
+
+    def add(self, value_s: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds_s, value_s)] += 1
+        self.count += 1
+        self.sum_s += value_s
+        self.max_s = max(self.max_s, value_s)
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th value, but never more than the largest value seen
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts[:-1]):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds_s[i], self.max_s)
+        return self.max_s
+
+    @property
+    def mean_s(self) -> float:
+        return self.sum_s / self.count if self.count else 0.0
+
+
+class RequestTracer:
+    def __init__(self, on_timing: Optional[Callable[[RequestTiming], None]] = None, histograms: bool = True):
+        self.on_timing = on_timing
+        self.record_histograms = histograms
+        self.histograms: Dict[Tuple[str, str, Optional[int], str], LatencyHistogram] = {}
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_queued_start.append(self._phase_start)
+        trace_config.on_connection_queued_end.append(self._phase_end("queued_s"))
+        trace_config.on_dns_resolvehost_start.append(self._phase_start)
+        trace_config.on_dns_resolvehost_end.append(self._phase_end("dns_s"))
+        trace_config.on_connection_create_start.append(self._phase_start)
+        trace_config.on_connection_create_end.append(self._phase_end("connect_s"))
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_request_headers_sent.append(self._on_request_headers_sent)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        return trace_config
+
+    def start(self, endpoint: str, method: str, attempt: int = 0) -> RequestTiming:
+        return RequestTiming(endpoint, method, attempt)
+
+    def finish(self, timing: RequestTiming) -> None:
+        now = time.perf_counter()
+        timing.total_s = now - timing.start
+        if timing.response_at is not None:
+            timing.read_s = now - timing.response_at
+
+        if self.record_histograms:
+            for phase in RequestTiming.PHASES:
+                value = getattr(timing, phase)
+                if value is not None:
+                    key = (timing.endpoint, timing.method, timing.status, phase)
+                    histogram = self.histograms.get(key)
+                    if histogram is None:
+                        histogram = self.histograms[key] = LatencyHistogram()
+                    histogram.add(value)
+
+        if self.on_timing is not None:
+            self.on_timing(timing)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{
+            "Endpoint": endpoint,
+            "Method": method,
+            "Status": status,
+            "Phase": phase,
+            "Count": histogram.count,
+            "MeanMs": round(histogram.mean_s * 1000, 3),
+            "P50Ms": round(histogram.quantile(0.5) * 1000, 3),
+            "P95Ms": round(histogram.quantile(0.95) * 1000, 3),
+            "P99Ms": round(histogram.quantile(0.99) * 1000, 3),
+            "MaxMs": round(histogram.max_s * 1000, 3),
+        } for (endpoint, method, status, phase), histogram in sorted(self.histograms.items(), key=str)]
+
+    def reset(self) -> None:
+        self.histograms.clear()
+
+    # aiohttp passes our RequestTiming as `trace_request_ctx`, requests made without one are ignored
+
+    @staticmethod
+    async def _phase_start(session: aiohttp.ClientSession, ctx: Any, params: Any) -> None:
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx._phase_start = time.perf_counter()
+
+    @staticmethod
+    def _phase_end(phase: str) -> Callable:
+
+        async def on_phase_end(session: aiohttp.ClientSession, ctx: Any, params: Any) -> None:
+            timing = ctx.trace_request_ctx
+            if timing is not None:
+                setattr(timing, phase, time.perf_counter() - timing._phase_start)
+
+        return on_phase_end
+
+    @staticmethod
+    async def _on_connection_reuseconn(session: aiohttp.ClientSession, ctx: Any, params: Any) -> None:
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx.reused_connection = True
+
+    @staticmethod
+    async def _on_request_headers_sent(session: aiohttp.ClientSession, ctx: Any, params: Any) -> None:
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx.sent_at = time.perf_counter()
+
+    @staticmethod
+    async def _on_request_end(session: aiohttp.ClientSession, ctx: Any, params: Any) -> None:
+        timing = ctx.trace_request_ctx
+        if timing is not None:
+            timing.response_at = time.perf_counter()
+            timing.status = params.response.status
+            timing.server_s = timing.response_at - (timing.sent_at if timing.sent_at is not None else timing.start)
+
+    @staticmethod
+    async def _on_request_exception(session: aiohttp.ClientSession, ctx: Any, params: Any) -> None:
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx.error = type(params.exception).__name__
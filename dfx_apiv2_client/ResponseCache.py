@@ -0,0 +1,138 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import collections
+import copy
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, OrderedDict, Tuple
+
+import aiohttp
+
+
+class _CacheEntry:
+    __slots__ = ("status", "body", "etag", "expires_at")
+
+    def __init__(self, status: int, body: Any, etag: Optional[str], expires_at: float):
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    DEFAULT_TTLS = {
+        "General.list_available_statuses": 3600.0,
+        "General.list_available_user_roles": 3600.0,
+        "General.list_accepted_mime_types": 3600.0,
+        "General.list_available_regions": 3600.0,
+        "Studies.types": 3600.0,
+        "Devices.types": 3600.0,
+        "Studies.retrieve": 300.0,
+    }
+
+    def __init__(self, ttls: Optional[Mapping[str, float]] = None, max_entries: int = 256):
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[Hashable, _CacheEntry] = collections.OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    async def fetch(self, name: str, session: aiohttp.ClientSession, url: str, kwargs: Dict[str, Any],
+                    send: Callable[..., Awaitable[Tuple[int, Any, Mapping[str, str]]]]) -> Tuple[int, Any]:
+        ttl_s = self.ttls.get(name)
+        if not ttl_s:
+            status, body, _ = await send(**kwargs)
+            return status, body
+
+        key = self._key(name, session, url, kwargs)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.status, copy.deepcopy(entry.body)
+
+        # Only one task fetches an expired entry, the others wait for its response
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            status, body = await asyncio.shield(inflight)
+            return status, copy.deepcopy(body)
+
+        self.misses += 1
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._revalidate(key, entry, ttl_s, kwargs, send)
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting, so don't let asyncio complain about an unretrieved exception
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            # Every caller gets its own copy, so changing a body can't change what the cache hands out next
+            return result[0], copy.deepcopy(result[1])
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, name: Optional[str] = None, url: Optional[str] = None) -> None:
+        if name is None:
+            self._entries.clear()
+        else:
+            for key in [key for key in self._entries if key[0] == name and (url is None or key[1] == url)]:
+                del self._entries[key]
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+    async def _revalidate(self, key: Hashable, entry: Optional[_CacheEntry], ttl_s: float, kwargs: Dict[str, Any],
+                          send: Callable[..., Awaitable[Tuple[int, Any, Mapping[str, str]]]]) -> Tuple[int, Any]:
+        if entry is not None and entry.etag:
+            kwargs = dict(kwargs, headers={**(kwargs.get("headers") or {}), "If-None-Match": entry.etag})
+
+        status, body, headers = await send(**kwargs)
+        if status == 304 and entry is not None:
+            self.revalidations += 1
+            entry.expires_at = time.monotonic() + ttl_s
+            self._entries.move_to_end(key)
+            return entry.status, entry.body
+
+        if 200 <= status < 300:
+            self._entries[key] = _CacheEntry(status, body, headers.get("ETag"), time.monotonic() + ttl_s)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return status, body
+
+    @staticmethod
+    def _key(name: str, session: aiohttp.ClientSession, url: str, kwargs: Dict[str, Any]) -> Hashable:
+        # Responses can differ by caller, e.g. `Studies.retrieve` for different organizations
+        headers = kwargs.get("headers") or {}
+        authorization = headers.get("Authorization") or session.headers.get("Authorization")
+        params = kwargs.get("params")
+        params = tuple(sorted(params.items())) if params else ()
+        return name, url, params, authorization
@@ -0,0 +1,223 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from .Measurements import Measurements
+
+
+class _Poll:
+    __slots__ = ("measurement_id", "chunk_order", "sent_at", "due", "interval_s", "deadline", "polls", "missed_at",
+                 "future")
+
+    def __init__(self, measurement_id: str, chunk_order: int, sent_at: float, due: float, deadline: float):
+        self.measurement_id = measurement_id
+        self.chunk_order = chunk_order
+        self.sent_at = sent_at
+        self.due = due
+        self.interval_s = 0.0
+        self.deadline = deadline
+        self.polls = 0
+        self.missed_at: Optional[float] = None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class ResultPoller:
+    def __init__(self,
+                 session: aiohttp.ClientSession,
+                 concurrency: int = 16,
+                 min_interval_s: float = 0.5,
+                 max_interval_s: float = 10.0,
+                 backoff: float = 2.0,
+                 result_timeout_s: float = 120.0,
+                 retrieve_intermediate: Optional[Callable[..., Awaitable[Any]]] = None,
+                 **kwargs: Any):
+        if concurrency < 1:
+            raise ValueError("ResultPoller concurrency must be at least 1")
+        self.session = session
+        self.concurrency = concurrency
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max_interval_s
+        self.backoff = backoff
+        self.result_timeout_s = result_timeout_s
+        self.kwargs = kwargs  # Passed to `Measurements.retrieve_intermediate`, e.g. `retry_policy`
+        # E.g. `client.measurements.retrieve_intermediate`, to poll with a DfxClient's token renewal and request tracer
+        self.retrieve_intermediate = retrieve_intermediate or functools.partial(Measurements.retrieve_intermediate,
+                                                                                session)
+
+        # How long after a chunk is sent its result shows up, learned from the results found so far
+        self.latency_s: Optional[float] = None
+        self.polls = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._heap: List[Tuple[float, int, _Poll]] = []
+        self._seq = itertools.count()
+        self._pending: Dict[str, Dict[int, _Poll]] = {}
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: set = set()
+        self._scheduler: Optional[asyncio.Task] = None
+
+    def expect(self,
+               measurement_id: str,
+               chunk_order: int,
+               duration_s: float = 0.0,
+               sent_at: Optional[float] = None) -> asyncio.Future:
+        # Resolves with the intermediate result of the chunk, or raises asyncio.TimeoutError
+        if self._scheduler is None:
+            self._scheduler = asyncio.ensure_future(self._schedule())
+
+        sent_at = time.monotonic() if sent_at is None else sent_at
+        # Until a result has been seen, expect one about a chunk's duration after it was sent
+        predicted_s = self.latency_s if self.latency_s is not None else duration_s
+        poll = _Poll(measurement_id, int(chunk_order), sent_at, sent_at + max(predicted_s, self.min_interval_s),
+                     sent_at + self.result_timeout_s)
+        self._pending.setdefault(measurement_id, {})[poll.chunk_order] = poll
+        poll.future.add_done_callback(lambda future: self._forget(poll) if future.cancelled() else None)
+        self._push(poll)
+        return poll.future
+
+    @property
+    def pending(self) -> int:
+        return sum(len(polls) for polls in self._pending.values())
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "polls": self.polls,
+            "hits": self.hits,
+            "misses": self.misses,
+            "latency_s": self.latency_s,
+        }
+
+    async def close(self) -> None:
+        tasks = list(self._tasks)
+        if self._scheduler is not None:
+            tasks.append(self._scheduler)
+            self._scheduler = None
+        for task in tasks:
+            task.cancel()
+        for polls in list(self._pending.values()):
+            for poll in list(polls.values()):
+                poll.future.cancel()
+        self._pending.clear()
+        self._heap.clear()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> "ResultPoller":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _push(self, poll: _Poll) -> None:
+        heapq.heappush(self._heap, (poll.due, next(self._seq), poll))
+        if self._heap[0][2] is poll:
+            self._wakeup.set()
+
+    async def _schedule(self) -> None:
+        # One timer for all measurements, sleeping until the earliest poll is due
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Everything that came due, e.g. after a stall, is polled at once up to `concurrency` at a time
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, poll = heapq.heappop(self._heap)
+                if due != poll.due:
+                    continue  # Rescheduled to an earlier time
+                if poll.future.done():
+                    continue  # Cancelled by the caller
+                task = asyncio.ensure_future(self._poll(poll))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _poll(self, poll: _Poll) -> None:
+        async with self._semaphore:
+            if poll.future.done():
+                return
+            poll.polls += 1
+            self.polls += 1
+            # When the server looked, rather than when the answer got back, is what brackets the result's latency
+            polled_at = time.monotonic()
+            try:
+                status, body = await self.retrieve_intermediate(poll.measurement_id,
+                                                                poll.chunk_order,
+                                                                raise_for_status=False,
+                                                                **self.kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                status, body = None, None
+
+        if poll.future.done():
+            self._forget(poll)
+            return  # Cancelled by the caller while the request was in flight
+
+        # The API answers an empty object until the result is ready
+        if status is not None and 200 <= status < 300 and body:
+            self.hits += 1
+            self._found(poll, body, polled_at)
+            return
+
+        self.misses += 1
+        poll.missed_at = polled_at
+        now = time.monotonic()
+        poll.interval_s = min(max(poll.interval_s * self.backoff, self.min_interval_s), self.max_interval_s)
+        if now >= poll.deadline:
+            self._forget(poll)
+            if poll.future.done():
+                return
+            poll.future.set_exception(
+                asyncio.TimeoutError(f"No result for chunk {poll.chunk_order} of measurement {poll.measurement_id} "
+                                     f"after {poll.polls} polls, last status {status}"))
+            poll.future.exception()
+            return
+        poll.due = min(now + poll.interval_s, poll.deadline)
+        self._push(poll)
+
+    def _found(self, poll: _Poll, result: Any, polled_at: float) -> None:
+        self._forget(poll)
+        if poll.future.done():
+            return
+        poll.future.set_result(result)
+
+        # The result was ready somewhere between the last empty poll and now, and when the first poll found it, it
+        # may have been ready earlier, so the prediction keeps probing earlier instead of only ever growing
+        if poll.missed_at is not None:
+            latency_s = (poll.missed_at + polled_at) / 2 - poll.sent_at
+        else:
+            latency_s = max(polled_at - poll.sent_at - self.min_interval_s, 0.0)
+        self.latency_s = latency_s if self.latency_s is None else 0.8 * self.latency_s + 0.2 * latency_s
+
+        # Results come in chunk order, so earlier chunks still waiting on a backoff are most likely ready too
+        now = time.monotonic()
+        for earlier in self._pending.get(poll.measurement_id, {}).values():
+            if earlier.chunk_order < poll.chunk_order and earlier.due > now:
+                earlier.due = now
+                earlier.interval_s = 0.0
+                self._push(earlier)
+
+    def _forget(self, poll: _Poll) -> None:
+        polls = self._pending.get(poll.measurement_id)
+        if polls is not None and polls.get(poll.chunk_order) is poll:
+            del polls[poll.chunk_order]
+            if not polls:
+                del self._pending[poll.measurement_id]
@@ -0,0 +1,175 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import csv
+import math
+import os
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from .MeasurementResults import MeasurementResults
+from .Measurements import Measurements
+from .Organizations import Organizations
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ResultsExport:
+    FORMATS = ("parquet", "npz", "csv")
+    LAYOUTS = ("wide", "long")
+
+    def __init__(self, concurrency: int = 16, organization: bool = False, layout: str = "wide"):
+        if concurrency < 1:
+            raise ValueError("ResultsExport concurrency must be at least 1")
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"ResultsExport layout must be one of {', '.join(self.LAYOUTS)}")
+        self.concurrency = concurrency
+        self.organization = organization  # Use `Organizations.retrieve_measurement` instead of `Measurements.retrieve`
+        self.layout = layout
+        self.errors: Dict[str, str] = {}
+
+        # "wide": one row per measurement and position, one column per signal, NaN past the end of a shorter signal.
+        # "long": one row per data point, keyed by measurement, signal and position, for signals of very different
+        # lengths or sets of signals that differ a lot between measurements
+        self.measurements = 0
+        self.rows = 0
+        self.measurement_ids: List[str] = []
+        self.study_ids: List[str] = []
+        self.status_ids: List[str] = []
+        self.created = array("d")
+        self.index = array("q")
+        self.signal_ids: List[str] = []  # "long" only
+        self.values = array("d")  # "long" only
+        self.signal_values: Dict[str, array] = {}  # "wide" only, by signal ID
+        self.signals: Dict[str, str] = {}  # Name of every signal ID exported so far
+
+    async def fetch(self, session: aiohttp.ClientSession, measurement_ids: Iterable[str], **kwargs: Any) -> int:
+        # A fixed set of workers pulls IDs, so tens of thousands of measurements don't become as many tasks
+        retrieve = Organizations.retrieve_measurement if self.organization else Measurements.retrieve
+        ids = iter(measurement_ids)
+        measurements = self.measurements
+
+        async def worker() -> None:
+            for measurement_id in ids:
+                try:
+                    status, body = await retrieve(session, measurement_id, raise_for_status=False, **kwargs)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self.errors[measurement_id] = f"{type(e).__name__}: {e}"
+                    continue
+                if status >= 400:
+                    self.errors[measurement_id] = f"{status}: {body}"
+                    continue
+                # One malformed measurement is reported like a failed request instead of ending the export
+                try:
+                    results = MeasurementResults.parse(body)
+                except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+                    self.errors[measurement_id] = f"Malformed response: {type(e).__name__}: {e}"
+                    continue
+                self.add(results)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return self.measurements - measurements
+
+    def add(self, results: MeasurementResults) -> None:
+        properties = results.properties
+        measurement_id = results.id or ""
+        study_id = properties.get("StudyID") or ""
+        status_id = properties.get("StatusID") or ""
+        created = properties.get("Created")
+        created = math.nan if created is None else created
+
+        def add_rows(count: int) -> None:
+            self.measurement_ids.extend([measurement_id] * count)
+            self.study_ids.extend([study_id] * count)
+            self.status_ids.extend([status_id] * count)
+            self.created.extend(array("d", [created]) * count)
+            self.index.extend(range(count))
+            self.rows += count
+
+        if self.layout == "long":
+            for signal in results:
+                count = len(signal.values)
+                add_rows(count)
+                self.signal_ids.extend([signal.id] * count)
+                self.values.extend(signal.values)
+                self.signals[signal.id] = signal.name
+        else:
+            rows = self.rows
+            add_rows(max((len(signal.values) for signal in results), default=0))
+            nan = array("d", [math.nan])
+            for signal in results:
+                column = self.signal_values.get(signal.id)
+                if column is None:
+                    # Measurements before the first one with this signal don't have it
+                    column = self.signal_values[signal.id] = nan * rows
+                column.extend(signal.values)
+                self.signals[signal.id] = signal.name
+            for column in self.signal_values.values():
+                if len(column) < self.rows:
+                    column.extend(nan * (self.rows - len(column)))
+        self.measurements += 1
+
+    def columns(self) -> Dict[str, Any]:
+        columns = {
+            "MeasurementID": self.measurement_ids,
+            "StudyID": self.study_ids,
+            "StatusID": self.status_ids,
+            "Created": self.created,
+            "Index": self.index,
+        }
+        if self.layout == "long":
+            columns["SignalID"] = self.signal_ids
+            columns["Value"] = self.values
+        else:
+            columns.update(self.signal_values)
+        return columns
+
+    @classmethod
+    def format_of(cls, path: str, format: Optional[str] = None) -> str:
+        # Raises before anything is fetched if the file can't be written
+        if format is None:
+            format = os.path.splitext(path)[1].lstrip(".").lower()
+        if format not in cls.FORMATS:
+            raise ValueError(f"ResultsExport can write {', '.join(cls.FORMATS)}, not {format!r}")
+        if format == "parquet" and (pyarrow is None or numpy is None):
+            raise ImportError("Writing .parquet requires pyarrow and numpy, `pip install dfx-apiv2-client[parquet]`")
+        if format == "npz" and numpy is None:
+            raise ImportError("Writing .npz requires numpy, `pip install dfx-apiv2-client[numpy]`")
+        return format
+
+    def write(self, path: str, format: Optional[str] = None) -> str:
+        format = self.format_of(path, format)
+        if format == "parquet":
+            pyarrow.parquet.write_table(
+                pyarrow.table({
+                    name: pyarrow.array(self._numpy(column) if isinstance(column, array) else column)
+                    for name, column in self.columns().items()
+                }), path)
+        elif format == "npz":
+            numpy.savez_compressed(path, **{name: self._numpy(column) for name, column in self.columns().items()})
+        else:
+            columns = self.columns()
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(zip(*columns.values()))
+        return format
+
+    @staticmethod
+    def _numpy(column: Any) -> Any:
+        # Numeric columns are viewed rather than copied
+        if isinstance(column, array):
+            return numpy.frombuffer(column, dtype=numpy.float64 if column.typecode == "d" else numpy.int64)
+        return numpy.asarray(column)
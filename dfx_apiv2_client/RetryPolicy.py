@@ -0,0 +1,84 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import datetime
+import email.utils
+import random
+from typing import Any, Iterable, Mapping, Optional
+
+
+class RetryPolicy:
+    IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff_base_s: float = 0.5,
+                 backoff_max_s: float = 30.0,
+                 max_retry_after_s: float = 120.0,
+                 retry_after_statuses: Iterable[int] = (429, 503),
+                 idempotent_statuses: Iterable[int] = (500, 502, 503, 504)):
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.max_retry_after_s = max_retry_after_s
+        self.retry_after_statuses = frozenset(retry_after_statuses)
+        self.idempotent_statuses = frozenset(idempotent_statuses)
+
+        self.attempts = 0
+        self.retries = 0
+        self.wait_s = 0.0
+
+    def delay(self,
+              attempt: int,
+              method: str,
+              status: Optional[int] = None,
+              headers: Optional[Mapping[str, str]] = None,
+              exception: Optional[BaseException] = None) -> Optional[float]:
+        if attempt >= self.max_retries:
+            return None
+
+        # The server says how long to wait, which is the minimum wait that will actually succeed
+        if status in self.retry_after_statuses and headers is not None:
+            retry_after = self.parse_retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after_s)
+
+        # A rate limited request was not processed, so it is safe to resend whatever the method
+        if status == 429 or (method.upper() in self.IDEMPOTENT_METHODS and
+                             (status in self.idempotent_statuses or exception is not None)):
+            return self.backoff(attempt)
+
+        return None
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter" exponential backoff spreads out clients that failed together
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2**attempt))
+
+    def record(self, delay: float) -> None:
+        self.retries += 1
+        self.wait_s += delay
+
+    def reset_stats(self) -> None:
+        self.attempts = 0
+        self.retries = 0
+        self.wait_s = 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {"attempts": self.attempts, "retries": self.retries, "wait_s": self.wait_s}
+
+    @staticmethod
+    def parse_retry_after(value: Any) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+        return max((retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
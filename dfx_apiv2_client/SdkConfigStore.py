@@ -0,0 +1,93 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import base64
+import hashlib
+import mmap
+import os
+import os.path
+import re
+import tempfile
+from typing import Any, Optional, Tuple
+
+import aiohttp
+
+from .Studies import Studies
+
+
+class SdkConfigStore:
+    def __init__(self, folder: str):
+        self.folder = folder
+        os.makedirs(os.path.join(folder, "refs"), exist_ok=True)
+
+    def blob_path(self, md5_hash: str) -> str:
+        return os.path.join(self.folder, f"{self._safe(md5_hash)}.cfg")
+
+    def ref_path(self, study_id: str, sdk_id: str) -> str:
+        return os.path.join(self.folder, "refs", f"{self._safe(study_id)}_{self._safe(sdk_id)}")
+
+    def current_hash(self, study_id: str, sdk_id: str) -> str:
+        try:
+            with open(self.ref_path(study_id, sdk_id), "r") as r:
+                md5_hash = r.read().strip()
+        except FileNotFoundError:
+            return ""
+        # Only trust a ref whose blob is still there, otherwise ask the server for the config again
+        return md5_hash if os.path.isfile(self.blob_path(md5_hash)) else ""
+
+    def load(self, md5_hash: str) -> mmap.mmap:
+        with open(self.blob_path(md5_hash), "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def put(self, data: bytes, md5_hash: Optional[str] = None) -> str:
+        # A blob is stored under the hash of what was received, a truncated or corrupt download never under the good one
+        actual_hash = hashlib.md5(data).hexdigest()
+        if md5_hash and md5_hash.lower() != actual_hash:
+            raise ValueError(f"SDK config hash mismatch: expected {md5_hash}, received {len(data)} bytes hashing "
+                             f"to {actual_hash}")
+        md5_hash = actual_hash
+        # Blobs are immutable, so one that exists is already correct
+        if not os.path.isfile(self.blob_path(md5_hash)):
+            self._atomic_write(self.blob_path(md5_hash), data)
+        return md5_hash
+
+    def set_ref(self, study_id: str, sdk_id: str, md5_hash: str) -> None:
+        self._atomic_write(self.ref_path(study_id, sdk_id), md5_hash.encode())
+
+    async def retrieve(self, session: aiohttp.ClientSession, study_id: str, sdk_id: str,
+                       **kwargs: Any) -> Tuple[str, mmap.mmap]:
+        current_hash = self.current_hash(study_id, sdk_id)
+        status, body = await Studies.retrieve_sdk_config_data(session, study_id, sdk_id, current_hash, **kwargs)
+        if status >= 400:
+            raise ValueError(f"Could not retrieve SDK config: API Status {status}, response: {body}")
+
+        # The server answers 304, or leaves out the file, when our hash is still current
+        if status != 304 and body and body.get("ConfigFile"):
+            data = base64.b64decode(body["ConfigFile"])
+            loop = asyncio.get_running_loop()
+            md5_hash = await loop.run_in_executor(None, self.put, data, body.get("MD5Hash"))
+            self.set_ref(study_id, sdk_id, md5_hash)
+        elif current_hash:
+            md5_hash = current_hash
+        else:
+            raise ValueError(f"Could not retrieve SDK config: API Status {status} without a config file")
+
+        return md5_hash, self.load(md5_hash)
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        # Write next to the target and rename, so other processes see the whole file or none of it
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _safe(name: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
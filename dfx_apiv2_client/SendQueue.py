@@ -0,0 +1,170 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import collections
+import time
+from typing import Deque, Optional, Tuple, Union
+
+import aiohttp
+
+
+class SendQueue:
+    def __init__(self,
+                 ws: aiohttp.ClientWebSocketResponse,
+                 max_bytes: int = 8 * 1024 * 1024,
+                 high_water: int = 1024 * 1024,
+                 low_water: Optional[int] = None):
+        if max_bytes < 1 or high_water < 1:
+            raise ValueError("SendQueue max_bytes and high_water must be at least 1")
+        self.ws = ws
+        self.max_bytes = max_bytes  # Frames queued but not yet written to the transport
+        self.high_water = high_water  # Bytes buffered in the transport before writing pauses
+        self.low_water = low_water if low_water is not None else high_water // 4
+
+        self.queued_bytes = 0
+        self.max_queued_bytes = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.wait_s = 0.0  # Producers waiting for room in the queue
+        self.drain_wait_s = 0.0  # Writer waiting for the transport to drain below low_water
+        self.max_transport_buffer_bytes = 0
+
+        self._queue: Deque[Tuple[bool, Union[str, bytes], int]] = collections.deque()
+        self._room = asyncio.Condition()
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+        # aiohttp's writer waits for the transport to drain once it holds more than the transport's high-water mark.
+        # Without a transport, only the bytes queued here are bounded
+        transport = self._transport()
+        if transport is not None:
+            try:
+                transport.set_write_buffer_limits(high=self.high_water, low=self.low_water)
+            except (AttributeError, NotImplementedError, ValueError):
+                pass
+
+    @property
+    def closed(self) -> bool:
+        return self.ws.closed
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def transport_buffer_bytes(self) -> int:
+        transport = self._transport()
+        if transport is None:
+            return 0
+        try:
+            return transport.get_write_buffer_size()
+        except (AttributeError, NotImplementedError):
+            return 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "queued_bytes": self.queued_bytes,
+            "max_queued_bytes": self.max_queued_bytes,
+            "transport_buffer_bytes": self.transport_buffer_bytes,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "wait_s": self.wait_s,
+            "drain_wait_s": self.drain_wait_s,
+            "max_transport_buffer_bytes": self.max_transport_buffer_bytes,
+        }
+
+    async def send_str(self, data: str, compress: Optional[int] = None) -> None:
+        # Text goes out as UTF-8, so its size is the encoded length rather than the number of characters
+        await self._put(False, data, len(data) if data.isascii() else len(data.encode("utf-8")))
+
+    async def send_bytes(self, data: Union[bytes, bytearray, memoryview], compress: Optional[int] = None) -> None:
+        await self._put(True, data, memoryview(data).nbytes)
+
+    async def join(self) -> None:
+        # Waits until everything queued so far has been written to the transport
+        async with self._room:
+            await self._room.wait_for(lambda: not self._queue or self._error is not None)
+        self._raise_error()
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        self._fail(ConnectionError("WebSocket error: Connection closed"))
+
+    async def _put(self, binary: bool, data: Union[str, bytes, bytearray, memoryview], size: int) -> None:
+        self._raise_error()
+        if self.closed:
+            raise ConnectionError("WebSocket error: Connection closed")
+        if self._writer is None:
+            self._writer = asyncio.ensure_future(self._write())
+
+        # A frame bigger than the whole queue still goes out, on its own
+        async with self._room:
+            if self.queued_bytes and self.queued_bytes + size > self.max_bytes:
+                start = time.perf_counter()
+                await self._room.wait_for(lambda: not self.queued_bytes or self.queued_bytes + size <= self.max_bytes or
+                                          self._error is not None)
+                self.wait_s += time.perf_counter() - start
+            self._raise_error()
+            self._queue.append((binary, data, size))
+            self.queued_bytes += size
+            self.max_queued_bytes = max(self.max_queued_bytes, self.queued_bytes)
+        self._ready.set()
+
+    async def _write(self) -> None:
+        # One writer keeps frames in the order they were queued
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    binary, data, size = self._queue[0]
+                    # Writing a frame doesn't block, so time spent in here is waiting for the transport to drain
+                    start = time.perf_counter()
+                    if binary:
+                        await self.ws.send_bytes(data)
+                    else:
+                        await self.ws.send_str(data)
+                    self.drain_wait_s += time.perf_counter() - start
+                    self.max_transport_buffer_bytes = max(self.max_transport_buffer_bytes, self.transport_buffer_bytes)
+                    self._queue.popleft()
+                    self.frames_sent += 1
+                    self.bytes_sent += size
+                    async with self._room:
+                        self.queued_bytes -= size
+                        self._room.notify_all()
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(e)
+
+    def _fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self._queue.clear()
+        self.queued_bytes = 0
+
+        async def wake() -> None:
+            async with self._room:
+                self._room.notify_all()
+
+        asyncio.ensure_future(wake())
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise ConnectionError(f"WebSocket error: Send failed: {self._error}") from self._error
+
+    def _transport(self) -> Optional[asyncio.WriteTransport]:
+        # aiohttp doesn't expose the transport of a client WebSocket, but its writer holds it. That's private, so
+        # anything else found there is ignored
+        transport = getattr(getattr(self.ws, "_writer", None), "transport", None)
+        return transport if isinstance(transport, asyncio.WriteTransport) else None
@@ -11,3 +11,6 @@ class Settings:
     user_id = ""
     user_token = ""
     user_refresh_token = ""
+    retry_policy = None
+    response_cache = None
+    request_tracer = None
@@ -17,6 +17,7 @@ class Studies(Base):
         params = {
             "StatusID": status,
         }
+        kwargs.setdefault("cache_as", cls.types.__qualname__)
         return await cls._get(session, f"{cls.url_fragment}/types", params=params, **kwargs)
 
     @classmethod
@@ -67,14 +68,17 @@ class Studies(Base):
             "Config": config,
         }
 
+        kwargs.setdefault("invalidates", cls.retrieve.__qualname__)
         return await cls._patch(session, f"{cls.url_fragment}/{study_id}", data=data, **kwargs)
 
     @classmethod
     async def retrieve(cls, session: aiohttp.ClientSession, study_id: str, **kwargs: Any) -> Any:
+        kwargs.setdefault("cache_as", cls.retrieve.__qualname__)
         return await cls._get(session, f"{cls.url_fragment}/{study_id}", **kwargs)
 
     @classmethod
     async def delete(cls, session: aiohttp.ClientSession, study_id: str, **kwargs: Any) -> Any:
+        kwargs.setdefault("invalidates", cls.retrieve.__qualname__)
         return await cls._delete(session, f"{cls.url_fragment}/{study_id}", **kwargs)
 
     @classmethod
@@ -0,0 +1,122 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import aiohttp
+
+from .DfxClient import BoundEndpoints, DfxClient
+
+_loop_lock = threading.Lock()
+_loop_thread: Optional[Tuple[int, asyncio.AbstractEventLoop, threading.Thread]] = None
+
+
+def _background_loop() -> Tuple[asyncio.AbstractEventLoop, threading.Thread]:
+    # One loop per process, a forked worker (e.g. gunicorn, uWSGI) doesn't inherit its parent's thread so starts its own
+    global _loop_thread
+    with _loop_lock:
+        if _loop_thread is None or _loop_thread[0] != os.getpid():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="dfx-apiv2-client", daemon=True)
+            thread.start()
+            _loop_thread = (os.getpid(), loop, thread)
+        return _loop_thread[1], _loop_thread[2]
+
+
+class SyncEndpoints:
+    def __init__(self, client: "SyncClient", bound: BoundEndpoints):
+        self._client = client
+        self._bound = bound
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._bound._endpoints, name)
+        if not self._bound.takes_session(name):
+            return attr  # `ws_*` helpers run on the caller's own WebSocket
+
+        @functools.wraps(attr)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if kwargs.get("stream"):
+                raise ValueError("SyncClient doesn't support stream=True, use DfxClient and `async for`")
+            # Bound on the loop, where the session lives
+            return self._client._submit(lambda: getattr(self._bound, name)(*args, **kwargs))
+
+        return call
+
+
+class SyncClient:
+    def __init__(self, timeout: Optional[float] = None, **client_kwargs: Any):
+        self.timeout = timeout  # How long a call blocks before it is cancelled, in addition to any aiohttp timeouts
+        self.client = DfxClient(**client_kwargs)
+        self._pid = os.getpid()
+        self._loop, self._thread = _background_loop()
+        self._opening: Optional[asyncio.Lock] = None
+
+        self.auths = SyncEndpoints(self, self.client.auths)
+        self.devices = SyncEndpoints(self, self.client.devices)
+        self.general = SyncEndpoints(self, self.client.general)
+        self.licenses = SyncEndpoints(self, self.client.licenses)
+        self.measurements = SyncEndpoints(self, self.client.measurements)
+        self.organizations = SyncEndpoints(self, self.client.organizations)
+        self.profiles = SyncEndpoints(self, self.client.profiles)
+        self.studies = SyncEndpoints(self, self.client.studies)
+        self.users = SyncEndpoints(self, self.client.users)
+
+    def run(self, fn: Callable[[aiohttp.ClientSession], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        # For anything without a blocking version, e.g. `client.run(lambda session: Paginator(...).to_list())`
+        return self._submit(lambda: fn(self.client.session), timeout)
+
+    def open(self) -> "SyncClient":
+        self._submit(None)
+        return self
+
+    def close(self) -> None:
+        self._submit(self.client.close, open=False)
+
+    def __enter__(self) -> "SyncClient":
+        return self.open()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def set_token(self, token: Optional[str]) -> None:
+        # The session's headers belong to the loop thread
+        async def set_token() -> None:
+            self.client.set_token(token)
+
+        self._submit(set_token, open=False)
+
+    def _submit(self,
+                make_coro: Optional[Callable[[], Awaitable[Any]]],
+                timeout: Optional[float] = None,
+                open: bool = True) -> Any:
+        # Blocks the calling thread while the coroutine runs on the background loop, from any number of threads
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("SyncClient can't be called from its own event loop, await the DfxClient instead")
+        if os.getpid() != self._pid:
+            raise RuntimeError("SyncClient was created before this process was forked, create a new one")
+
+        async def call() -> Any:
+            if open:
+                await self._open()
+            if make_coro is not None:
+                return await make_coro()
+
+        future = asyncio.run_coroutine_threadsafe(call(), self._loop)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def _open(self) -> None:
+        # The session is opened on first use, or reopened after `close()`, once even when calls arrive together
+        if self._opening is None:
+            self._opening = asyncio.Lock()
+        async with self._opening:
+            if self.client._session is None or self.client._session.closed:
+                await self.client.open()
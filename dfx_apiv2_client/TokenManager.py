@@ -0,0 +1,158 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import base64
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import aiohttp
+
+from .Auths import Auths
+from .Settings import Settings
+
+
+class TokenManager:
+    def __init__(self,
+                 renew_margin_s: float = 300.0,
+                 refresh_token_expires_sec: Optional[int] = None,
+                 on_renewed: Optional[Callable[["TokenManager"], None]] = None):
+        self.renew_margin_s = renew_margin_s
+        self.refresh_token_expires_sec = refresh_token_expires_sec
+        self.on_renewed = on_renewed
+        self.renewals = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._renewing: Optional[asyncio.Future] = None
+        self._background: Optional[asyncio.Task] = None
+        self._received: Tuple[str, float] = ("", 0.0)  # When the current token was first seen, for tokens without `iat`
+
+    @property
+    def using_user_token(self) -> bool:
+        return bool(Settings.user_token)
+
+    @property
+    def token(self) -> str:
+        return Settings.user_token if self.using_user_token else Settings.device_token
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        return self.token_expiry(self.token)
+
+    @property
+    def renews_at(self) -> Optional[float]:
+        token = self.token
+        expires_at = self.token_expiry(token)
+        if expires_at is None:
+            return None
+        issued_at = self.token_claim(token, "iat")
+        if issued_at is None:
+            if self._received[0] != token:
+                self._received = (token, time.time())
+            issued_at = self._received[1]
+        # A token that lives no longer than the margin would be due as soon as it arrives, so at most half its
+        # lifetime is given up
+        return expires_at - min(self.renew_margin_s, (expires_at - issued_at) / 2)
+
+    @staticmethod
+    def token_claim(token: str, claim: str) -> Optional[float]:
+        # The tokens are JWTs, the claims are in the unverified payload
+        try:
+            payload = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return float(claims[claim])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def token_expiry(cls, token: str) -> Optional[float]:
+        return cls.token_claim(token, "exp")
+
+    def needs_renewal(self) -> bool:
+        renews_at = self.renews_at
+        return renews_at is not None and renews_at <= time.time()
+
+    async def start(self, session: aiohttp.ClientSession) -> None:
+        self._session = session
+        self._set_header()
+        if self.needs_renewal():
+            await self.renew()
+        if self._background is None:
+            self._background = asyncio.ensure_future(self._renew_before_expiry())
+
+    async def stop(self) -> None:
+        background, self._background = self._background, None
+        if background is not None:
+            background.cancel()
+            try:
+                await background
+            except asyncio.CancelledError:
+                pass
+
+    async def renew(self, failed_token: Optional[str] = None) -> None:
+        # A caller that saw a 401 for a token that has since been replaced doesn't need another renewal
+        if failed_token is not None and failed_token != self.token:
+            return
+
+        # Single-flight: every concurrent caller waits on the same renewal request
+        if self._renewing is None:
+            self._renewing = asyncio.ensure_future(self._renew())
+            self._renewing.add_done_callback(self._renewal_done)
+        await asyncio.shield(self._renewing)
+
+    async def call(self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        token = self.token
+        try:
+            status, body = await method(*args, **kwargs)
+        except aiohttp.ClientResponseError as e:
+            if e.status != 401:
+                raise
+            await self.renew(token)
+            return await method(*args, **kwargs)
+
+        if status == 401:
+            await self.renew(token)
+            return await method(*args, **kwargs)
+
+        return status, body
+
+    async def _renew(self) -> None:
+        if self._session is None:
+            raise RuntimeError("TokenManager is not started")
+
+        if self.using_user_token:
+            status, body = await Auths.renew_user_token(self._session,
+                                                        self.refresh_token_expires_sec,
+                                                        raise_for_status=False)
+        else:
+            status, body = await Auths.renew_device_token(self._session,
+                                                          self.refresh_token_expires_sec,
+                                                          raise_for_status=False)
+        if status >= 400:
+            raise ValueError(f"Token renewal failed: API Status {status}, response: {body}")
+
+        self.renewals += 1
+        self._set_header()
+        if self.on_renewed is not None:
+            self.on_renewed(self)
+
+    def _renewal_done(self, future: asyncio.Future) -> None:
+        self._renewing = None
+        if not future.cancelled():
+            future.exception()  # Retrieved by the awaiting callers, don't log it again
+
+    def _set_header(self) -> None:
+        if self._session is not None and self.token:
+            self._session.headers["Authorization"] = f"Bearer {self.token}"
+
+    async def _renew_before_expiry(self) -> None:
+        while True:
+            renews_at = self.renews_at
+            if renews_at is None:
+                return
+            await asyncio.sleep(max(renews_at - time.time(), 1.0))
+            try:
+                await self.renew()
+            except (aiohttp.ClientError, ValueError):
+                # Keep the current token; a 401 will trigger another attempt through `call`
+                await asyncio.sleep(self.renew_margin_s / 10)
@@ -0,0 +1,204 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+import aiohttp
+
+from .Base import Base
+from .ChunkLatencyTracker import ChunkLatencyTracker
+from .Measurements import Measurements
+from .Organizations import Organizations
+from .SendQueue import SendQueue
+
+
+class WebSocketSubscription:
+    def __init__(self, client: "WebSocketClient", request_id: str, measurement_id: Optional[str] = None):
+        self.request_id = request_id
+        self.measurement_id = measurement_id
+        self.status: Optional[int] = None
+        self.response: Any = None
+        self._client = client
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def receive(self) -> Any:
+        frame = await self._queue.get()
+        if frame is None:
+            self._queue.put_nowait(None)
+            raise ConnectionError("WebSocket error: Connection closed")
+        if self._client.raise_for_status:
+            Base.ws_raise_for_status(frame.status, frame.request_id, frame.text)
+        return frame.json()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self.receive()
+        except ConnectionError:
+            raise StopAsyncIteration
+
+    def close(self) -> None:
+        self._client._streams.pop(self.request_id, None)
+
+    async def __aenter__(self) -> "WebSocketSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class WebSocketClient:
+    def __init__(self,
+                 ws: aiohttp.ClientWebSocketResponse,
+                 raise_for_status: bool = True,
+                 request_timeout: Optional[float] = None,
+                 latency_tracker: Optional[ChunkLatencyTracker] = None,
+                 send_queue: Optional[SendQueue] = None):
+        self.ws = ws
+        self.raise_for_status = raise_for_status
+        self.request_timeout = request_timeout
+        self.latency_tracker = latency_tracker
+        self.send_queue = send_queue
+        self._request_ids = itertools.count()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, WebSocketSubscription] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def connect(cls,
+                      session: aiohttp.ClientSession,
+                      raise_for_status: bool = True,
+                      request_timeout: Optional[float] = None,
+                      latency_tracker: Optional[ChunkLatencyTracker] = None,
+                      send_queue_bytes: Optional[int] = None,
+                      **kwargs: Any) -> "WebSocketClient":
+        ws = await Base.ws_connect(session, **kwargs)
+        send_queue = SendQueue(ws, max_bytes=send_queue_bytes) if send_queue_bytes is not None else None
+        client = cls(ws, raise_for_status, request_timeout, latency_tracker, send_queue)
+        client.start()
+        return client
+
+    @property
+    def closed(self) -> bool:
+        return self.ws.closed
+
+    @property
+    def load(self) -> int:
+        return len(self._pending) + len(self._streams)
+
+    def start(self) -> None:
+        if self._reader is None:
+            self._reader = asyncio.ensure_future(self._read())
+
+    async def close(self) -> None:
+        if self.send_queue is not None:
+            try:
+                await self.send_queue.join()
+            except ConnectionError:
+                pass
+            await self.send_queue.close()
+        await self.ws.close()
+        if self._reader is not None:
+            await self._reader
+
+    async def __aenter__(self) -> "WebSocketClient":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def new_request_id(self) -> str:
+        # A per-connection counter can never collide with a request that is still in flight
+        return f"{next(self._request_ids) % 0x10000000000:010x}"
+
+    async def request(self, sender: Callable[..., Awaitable[None]], *args: Any, **kwargs: Any) -> Tuple[int, Any]:
+        future = await self.send(sender, *args, **kwargs)
+        return await asyncio.wait_for(future, self.request_timeout)
+
+    async def send(self, sender: Callable[..., Awaitable[None]], *args: Any, **kwargs: Any) -> asyncio.Future:
+        if self.closed:
+            raise ConnectionError("WebSocket error: Connection closed")
+
+        request_id = self.new_request_id()
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda _: self._pending.pop(request_id, None))
+        self._pending[request_id] = future
+        try:
+            # Senders only use `send_str`/`send_bytes`, which the queue provides too
+            await sender(self.send_queue if self.send_queue is not None else self.ws, request_id, *args, **kwargs)
+        except BaseException:
+            self._pending.pop(request_id, None)
+            raise
+        return future
+
+    async def auth(self) -> Tuple[int, Any]:
+        return await self.request(Organizations.ws_auth_with_token)
+
+    async def subscribe(self, measurement_id: str) -> WebSocketSubscription:
+        subscription = WebSocketSubscription(self, self.new_request_id(), measurement_id)
+        self._streams[subscription.request_id] = subscription
+        try:
+            subscription.status, subscription.response = await self.request(Measurements.ws_subscribe_to_results,
+                                                                             measurement_id, subscription.request_id)
+        except BaseException:
+            subscription.close()
+            raise
+        return subscription
+
+    async def add_data(self, measurement_id: str, action: str, payload: Union[bytes, bytearray, memoryview],
+                       **kwargs: Any) -> Tuple[int, Any]:
+        if self.latency_tracker is None:
+            return await self.request(Measurements.ws_add_data, measurement_id, action, payload, **kwargs)
+
+        chunk_order = self.latency_tracker.sent(measurement_id, kwargs.get("chunk_order"))
+        try:
+            return await self.request(Measurements.ws_add_data, measurement_id, action, payload, **kwargs)
+        except BaseException:
+            # A chunk the server didn't accept will never get a result
+            self.latency_tracker.discard(measurement_id, chunk_order)
+            raise
+
+    async def _read(self) -> None:
+        try:
+            async for msg in self.ws:
+                if msg.type != aiohttp.WSMsgType.BINARY:
+                    continue
+                # The payload of frames nobody is waiting for is never decoded
+                try:
+                    frame = Base.ws_decode_frame(msg)
+                except ValueError:
+                    continue  # A malformed header can't be routed to anyone, but shouldn't end the connection
+
+                future = self._pending.pop(frame.request_id, None)
+                if future is not None:
+                    if future.done():
+                        continue
+                    # Whatever is wrong with one frame belongs to its request, the connection carries on
+                    try:
+                        if self.raise_for_status and frame.status >= 400:
+                            Base.ws_raise_for_status(frame.status, frame.request_id, frame.text)
+                        future.set_result((frame.status, frame.json()))
+                    except Exception as e:
+                        future.set_exception(e)
+                    continue
+
+                subscription = self._streams.get(frame.request_id)
+                if subscription is not None:
+                    # Timed on arrival rather than when read, so a slow consumer doesn't look like a slow server
+                    if self.latency_tracker is not None and frame.status < 400:
+                        try:
+                            self.latency_tracker.received(subscription.measurement_id, frame.json())
+                        except Exception:
+                            pass
+                    subscription._queue.put_nowait(frame)
+        finally:
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(ConnectionError("WebSocket error: Connection closed"))
+            for subscription in self._streams.values():
+                subscription._queue.put_nowait(None)
@@ -0,0 +1,43 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+from typing import Any, Union
+
+from .Codec import Codec
+
+_UNSET = object()
+
+
+class WebSocketFrame:
+    __slots__ = ("request_id", "status", "_data", "_text", "_json")
+
+    header_size = 13
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        if len(data) < self.header_size:
+            raise ValueError(f"WebSocket error: Frame of {len(data)} bytes is shorter than its header")
+
+        # Only the 10-char request ID and the 3-digit status are decoded up front, that's all routing needs
+        self.request_id = bytes(data[:10]).decode('utf-8')
+        self.status = int(bytes(data[10:13]))
+        self._data = data
+        self._text = None
+        self._json = _UNSET
+
+    @property
+    def payload(self) -> memoryview:
+        return memoryview(self._data)[self.header_size:]
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = str(self.payload, 'utf-8')
+        return self._text
+
+    def json(self) -> Any:
+        if self._json is _UNSET:
+            self._json = Codec.loads(self.payload) if len(self._data) > self.header_size else None
+        return self._json
+
+    def __repr__(self) -> str:
+        return f"WebSocketFrame(request_id={self.request_id!r}, status={self.status}, size={len(self._data)})"
@@ -0,0 +1,66 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+from typing import Any, List, Optional
+
+import aiohttp
+
+from .ChunkLatencyTracker import ChunkLatencyTracker
+from .WebSocketClient import WebSocketClient
+
+
+class WebSocketMultiplexer:
+    def __init__(self,
+                 session: aiohttp.ClientSession,
+                 connections: int = 1,
+                 raise_for_status: bool = True,
+                 request_timeout: Optional[float] = None,
+                 latency_tracker: Optional[ChunkLatencyTracker] = None,
+                 **ws_kwargs: Any):
+        if connections < 1:
+            raise ValueError("WebSocketMultiplexer needs at least one connection")
+        self._session = session
+        self._num_connections = connections
+        self._raise_for_status = raise_for_status
+        self._request_timeout = request_timeout
+        self.latency_tracker = latency_tracker
+        self._ws_kwargs = ws_kwargs
+        self._clients: List[WebSocketClient] = []
+        self._turn = 0
+
+    @property
+    def clients(self) -> List[WebSocketClient]:
+        return self._clients
+
+    async def connect(self) -> None:
+        self._clients = await asyncio.gather(*[self._open_client() for _ in range(self._num_connections)])
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, []
+        await asyncio.gather(*[client.close() for client in clients])
+
+    def client(self) -> WebSocketClient:
+        # Frames are routed back by request ID inside each client, so any measurement can share any connection
+        live = [client for client in self._clients if not client.closed]
+        if not live:
+            raise ConnectionError("WebSocket error: Multiplexer has no open connections")
+        self._turn = (self._turn + 1) % len(live)
+        return min(live[self._turn:] + live[:self._turn], key=lambda client: client.load)
+
+    async def __aenter__(self) -> "WebSocketMultiplexer":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _open_client(self) -> WebSocketClient:
+        client = await WebSocketClient.connect(self._session, self._raise_for_status, self._request_timeout,
+                                               self.latency_tracker, **self._ws_kwargs)
+
+        # Auth using `ws_auth_with_token` if headers cannot be manipulated
+        if "Authorization" not in self._session.headers:
+            await client.auth()
+
+        return client
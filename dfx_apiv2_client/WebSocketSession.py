@@ -0,0 +1,343 @@
+# Copyright (c) Nuralogix. All rights reserved. Licensed under the MIT license.
+# See LICENSE.txt in the project root for license information
+
+import asyncio
+import collections
+from typing import Any, Dict, List, Optional, OrderedDict, Tuple, Union
+
+import aiohttp
+
+from .ChunkLatencyTracker import ChunkLatencyTracker
+from .RetryPolicy import RetryPolicy
+from .WebSocketClient import WebSocketClient, WebSocketSubscription
+
+
+class _Chunk:
+    __slots__ = ("chunk_order", "action", "payload", "kwargs", "generation", "sends", "sending", "accepted")
+
+    def __init__(self, chunk_order: int, action: str, payload: Union[bytes, bytearray, memoryview],
+                 kwargs: Dict[str, Any]):
+        self.chunk_order = chunk_order
+        self.action = action
+        self.payload = payload
+        self.kwargs = kwargs
+        self.generation = -1  # The connection this chunk was last sent on
+        self.sends = 0
+        self.sending = False
+        self.accepted: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _MeasurementState:
+    __slots__ = ("subscribed", "queue", "chunks", "next_chunk_order", "duplicates")
+
+    def __init__(self):
+        self.subscribed = False
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.chunks: OrderedDict[int, _Chunk] = collections.OrderedDict()  # Sent, but no result yet
+        self.next_chunk_order = 0
+        # Results still expected for chunks that were resent after their first result arrived, to be dropped
+        self.duplicates: Dict[int, int] = {}
+
+
+class SessionSubscription:
+    def __init__(self, ws_session: "WebSocketSession", measurement_id: str):
+        self.measurement_id = measurement_id
+        self._ws_session = ws_session
+
+    async def receive(self) -> Any:
+        state = self._ws_session._measurements.get(self.measurement_id)
+        if state is None:
+            raise ConnectionError("WebSocket error: Subscription closed")
+        item = await state.queue.get()
+        if item is None:
+            state.queue.put_nowait(None)
+            raise ConnectionError("WebSocket error: Session closed")
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self.receive()
+        except ConnectionError:
+            raise StopAsyncIteration
+
+    def close(self) -> None:
+        self._ws_session._unsubscribe(self.measurement_id)
+
+    async def __aenter__(self) -> "SessionSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class WebSocketSession:
+    def __init__(self,
+                 session: aiohttp.ClientSession,
+                 auth: Optional[bool] = None,
+                 heartbeat_s: Optional[float] = 10.0,
+                 request_timeout: Optional[float] = 30.0,
+                 reconnect_policy: Optional[RetryPolicy] = None,
+                 latency_tracker: Optional[ChunkLatencyTracker] = None,
+                 send_queue_bytes: Optional[int] = None):
+        self.session = session
+        # Send `ws_auth_with_token` on every connection, by default when the session has no Authorization header
+        self.auth = auth if auth is not None else "Authorization" not in session.headers
+        self.heartbeat_s = heartbeat_s  # A peer that doesn't answer a ping within half of this is considered dead
+        self.request_timeout = request_timeout
+        self.reconnect_policy = reconnect_policy if reconnect_policy is not None else RetryPolicy(max_retries=10)
+        self.latency_tracker = latency_tracker
+        self.send_queue_bytes = send_queue_bytes
+
+        self.client: Optional[WebSocketClient] = None
+        self.reconnects = 0
+        self.replayed = 0
+
+        self._generation = 0
+        self._measurements: Dict[str, _MeasurementState] = {}
+        self._pumps: Dict[str, asyncio.Task] = {}
+        self._connected = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def connect(self) -> "WebSocketSession":
+        if self._supervisor is None:
+            await self._open()
+            self._supervisor = asyncio.ensure_future(self._supervise())
+        return self
+
+    async def close(self) -> None:
+        self._closing = True
+        # Stopped first, so a connection it was opening is either closed by it or assigned and closed below
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except BaseException:
+                pass
+            self._supervisor = None
+        if self.client is not None:
+            await self.client.close()
+        self._fail(ConnectionError("WebSocket error: Session closed"))
+
+    async def __aenter__(self) -> "WebSocketSession":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def subscribe(self, measurement_id: str) -> SessionSubscription:
+        state = self._state(measurement_id)
+        if not state.subscribed:
+            state.subscribed = True
+            if self.connected:
+                try:
+                    await self._subscribe(self.client, measurement_id)
+                except (ConnectionError, asyncio.TimeoutError):
+                    pass  # Resubscribed on reconnect
+                except BaseException:
+                    state.subscribed = False
+                    raise
+        return SessionSubscription(self, measurement_id)
+
+    async def add_data(self,
+                       measurement_id: str,
+                       action: str,
+                       payload: Union[bytes, bytearray, memoryview],
+                       chunk_order: Optional[int] = None,
+                       **kwargs: Any) -> Tuple[int, Any]:
+        if self._closing:
+            raise ConnectionError("WebSocket error: Session closed")
+
+        # Chunks are kept until their result arrives, so they can be resent if the connection drops before then
+        state = self._state(measurement_id)
+        if chunk_order is None:
+            chunk_order = state.next_chunk_order
+        chunk_order = int(chunk_order)
+        state.next_chunk_order = max(state.next_chunk_order, chunk_order + 1)
+        chunk = state.chunks[chunk_order] = _Chunk(chunk_order, action, payload, kwargs)
+
+        if self.connected:
+            await self._send_chunk(self.client, measurement_id, chunk)
+        return await asyncio.shield(chunk.accepted)
+
+    def pending(self, measurement_id: str) -> List[int]:
+        state = self._measurements.get(measurement_id)
+        return list(state.chunks) if state is not None else []
+
+    async def _open(self) -> None:
+        client = await WebSocketClient.connect(self.session,
+                                               raise_for_status=True,
+                                               request_timeout=self.request_timeout,
+                                               latency_tracker=self.latency_tracker,
+                                               send_queue_bytes=self.send_queue_bytes,
+                                               heartbeat=self.heartbeat_s)
+        try:
+            if self.auth:
+                await client.auth()
+            self._generation += 1
+            self.client = client
+            for measurement_id, state in list(self._measurements.items()):
+                if state.subscribed:
+                    await self._subscribe(client, measurement_id)
+
+            # Resend every chunk that never got a result, including ones added while this connection was opening
+            while True:
+                unsent = [(measurement_id, chunk) for measurement_id, state in list(self._measurements.items())
+                          for chunk in list(state.chunks.values()) if chunk.generation != self._generation]
+                if not unsent:
+                    break
+                for measurement_id, chunk in unsent:
+                    if chunk.generation >= 0:
+                        self.replayed += 1
+                    await self._send_chunk(client, measurement_id, chunk)
+                    if client.closed:
+                        raise ConnectionError("WebSocket error: Connection closed")
+        except BaseException:
+            await client.close()
+            raise
+        self._connected.set()
+
+    async def _supervise(self) -> None:
+        while not self._closing:
+            await asyncio.wait([self.client._reader])
+            if self._closing:
+                return
+            self._connected.clear()
+
+            attempt = 0
+            while True:
+                try:
+                    await self._open()
+                    break
+                except Exception as e:
+                    # Including a rejected auth, the session's token may have been renewed by the next attempt
+                    delay = self.reconnect_policy.delay(attempt, "GET", exception=e)
+                    if delay is None:
+                        self._closing = True
+                        self._fail(
+                            ConnectionError(f"WebSocket error: Reconnect failed after {attempt + 1} attempts, "
+                                            f"last error: {type(e).__name__}: {e}"))
+                        return
+                    self.reconnect_policy.record(delay)
+                    await asyncio.sleep(delay)
+                    attempt += 1
+            self.reconnects += 1
+
+    async def _subscribe(self, client: WebSocketClient, measurement_id: str) -> None:
+        subscription = await client.subscribe(measurement_id)
+        pump = self._pumps.get(measurement_id)
+        if pump is not None:
+            pump.cancel()
+        self._pumps[measurement_id] = asyncio.ensure_future(self._pump(subscription))
+
+    async def _pump(self, subscription: WebSocketSubscription) -> None:
+        # Moves results from this connection's subscription to the queue that outlives it
+        measurement_id = subscription.measurement_id
+        async with subscription:
+            while True:
+                state = self._measurements.get(measurement_id)
+                if state is None or not state.subscribed:
+                    return
+                try:
+                    result = await subscription.receive()
+                except ConnectionError:
+                    return
+                except Exception as e:
+                    # A bad result frame is reported to the caller without stopping the results after it
+                    state.queue.put_nowait(e)
+                    continue
+
+                chunk_order = result.get("ChunkOrder") if isinstance(result, dict) else None
+                try:
+                    chunk_order = None if chunk_order is None else int(chunk_order)
+                except (TypeError, ValueError):
+                    chunk_order = None
+                if chunk_order is None:
+                    chunk = state.chunks.popitem(last=False)[1] if state.chunks else None
+                else:
+                    duplicates = state.duplicates.get(chunk_order)
+                    if duplicates:
+                        # A replayed chunk the server had already processed
+                        if duplicates > 1:
+                            state.duplicates[chunk_order] = duplicates - 1
+                        else:
+                            del state.duplicates[chunk_order]
+                        continue
+                    chunk = state.chunks.pop(chunk_order, None)
+                    if chunk is not None and chunk.sends > 1:
+                        state.duplicates[chunk_order] = chunk.sends - 1
+                if chunk is not None and not chunk.sending:
+                    self._ack_lost(chunk)
+                state.queue.put_nowait(result)
+
+    async def _send_chunk(self, client: WebSocketClient, measurement_id: str, chunk: _Chunk) -> None:
+        chunk.generation = self._generation
+        chunk.sends += 1
+        chunk.sending = True
+        try:
+            try:
+                response = await client.add_data(measurement_id,
+                                                 chunk.action,
+                                                 chunk.payload,
+                                                 chunk_order=chunk.chunk_order,
+                                                 **chunk.kwargs)
+            finally:
+                chunk.sending = False
+        except (ConnectionError, asyncio.TimeoutError):
+            # Resent on reconnect, unless its result came in meanwhile
+            state = self._measurements.get(measurement_id)
+            if state is None or state.chunks.get(chunk.chunk_order) is not chunk:
+                self._ack_lost(chunk)
+            return
+        except ValueError as e:
+            # Rejected by the server, resending won't help
+            state = self._measurements.get(measurement_id)
+            if state is not None:
+                state.chunks.pop(chunk.chunk_order, None)
+            if not chunk.accepted.done():
+                chunk.accepted.set_exception(e)
+            return
+        if not chunk.accepted.done():
+            chunk.accepted.set_result(response)
+
+    @staticmethod
+    def _ack_lost(chunk: _Chunk) -> None:
+        # The chunk has a result, so the server took it, but the response to `add_data` itself never arrived
+        if not chunk.accepted.done():
+            chunk.accepted.set_result((200, None))
+
+    def _state(self, measurement_id: str) -> _MeasurementState:
+        state = self._measurements.get(measurement_id)
+        if state is None:
+            state = self._measurements[measurement_id] = _MeasurementState()
+        return state
+
+    def _unsubscribe(self, measurement_id: str) -> None:
+        state = self._measurements.get(measurement_id)
+        if state is not None:
+            state.subscribed = False
+            pump = self._pumps.pop(measurement_id, None)
+            if pump is not None:
+                pump.cancel()
+            if not state.chunks:
+                del self._measurements[measurement_id]
+
+    def _fail(self, error: ConnectionError) -> None:
+        self._connected.clear()
+        for pump in self._pumps.values():
+            pump.cancel()
+        for state in self._measurements.values():
+            for chunk in state.chunks.values():
+                if not chunk.accepted.done():
+                    chunk.accepted.set_exception(error)
+                    chunk.accepted.exception()
+            state.queue.put_nowait(None)
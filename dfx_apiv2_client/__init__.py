@@ -2,12 +2,33 @@
 # See LICENSE.txt in the project root for license information
 
 from .Auths import Auths
+from .BulkIngestion import BulkIngestion, IngestionOutcome
+from .ChunkLatencyTracker import ChunkLatencyTracker
+from .Codec import Codec
 from .Devices import Devices
+from .DfxClient import DfxClient
 from .General import General
+from .JsonArrayStream import JsonArrayStream
 from .Licenses import Licenses
+from .MeasurementResults import MeasurementResults, SignalResult
 from .Measurements import Measurements
 from .Organizations import Organizations
+from .Paginator import Paginator
+from .PayloadFolder import PayloadChunk, PayloadFolder
 from .Profiles import Profiles
+from .RequestTracer import LatencyHistogram, RequestTiming, RequestTracer
+from .ResponseCache import ResponseCache
+from .ResultPoller import ResultPoller
+from .ResultsExport import ResultsExport
+from .RetryPolicy import RetryPolicy
+from .SdkConfigStore import SdkConfigStore
+from .SendQueue import SendQueue
 from .Settings import Settings
 from .Studies import Studies
+from .SyncClient import SyncClient, SyncEndpoints
+from .TokenManager import TokenManager
 from .Users import Users
+from .WebSocketClient import WebSocketClient, WebSocketSubscription
+from .WebSocketFrame import WebSocketFrame
+from .WebSocketMultiplexer import WebSocketMultiplexer
+from .WebSocketSession import SessionSubscription, WebSocketSession
@@ -3,6 +3,8 @@
 
 import datetime
 
+from dfx_apiv2_client import MeasurementResults
+
 TIMESTAMP_KEYS = ["Created", "Updated"]
 
 
@@ -17,27 +19,22 @@ def print_pretty(x, csv=False, indent=0) -> None:
 
 def print_meas(measurement_results, csv=False):
     if "Results" in measurement_results:
+        results = MeasurementResults.parse(measurement_results)
         grid_results = []
-        for signal_id, signal_name in measurement_results["SignalNames"].items():
-            result_data = measurement_results["Results"][signal_id][0]
-            units = measurement_results["SignalUnits"][signal_id]
-            description = measurement_results["SignalDescriptions"][signal_id]
+        for signal in results:
+            description = signal.description
             if not csv and len(description) > 100:
                 description = description[:100] + "..."
             grid_result = {
-                "ID": signal_id,
-                "Name": signal_name,
-                "Value": sum(result_data["Data"]) / len(result_data["Data"]) / result_data["Multiplier"],
-                "Unit": units if units is not None else "",
-                "Category": measurement_results["SignalConfig"][signal_id]["category"],
+                "ID": signal.id,
+                "Name": signal.name,
+                "Value": signal.mean,
+                "Unit": signal.unit,
+                "Category": signal.category,
                 "Description": description
             }
             grid_results.append(grid_result)
-        measurement_results["Results"] = grid_results
-        del measurement_results["SignalNames"]
-        del measurement_results["SignalUnits"]
-        del measurement_results["SignalDescriptions"]
-        del measurement_results["SignalConfig"]
+        measurement_results = dict(results.properties, Results=grid_results)
     print_pretty(measurement_results, csv)
 
 
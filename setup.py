@@ -15,6 +15,12 @@ setup(
     install_requires=[
         'aiohttp<4',
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'ujson': ['ujson'],
+        'numpy': ['numpy'],
+        'parquet': ['numpy', 'pyarrow'],
+    },
     description='dfx-apiv2-client is a Python 3 asyncio client library for the Nuralogix DeepAffex API.',
     long_description=long_description,
     long_description_content_type='text/markdown',